@@ -0,0 +1,259 @@
+"""
+This module adapt and provide asyncio access to postgresSQL DB -> same api's as postgres.PGClass
+based on asyncpg connections pool, so several queries can run concurrently without blocking the event loop
+"""
+import asyncio
+import logging
+
+from mc_automation_tools import postgres
+
+try:
+    import asyncpg
+except ImportError:  # optional dependency, required only by AsyncPGClass.connect
+    asyncpg = None
+
+_log = logging.getLogger("mc_automation_tools.async_postgres")
+
+
+class AsyncPGClass:
+    """
+    This class create and provide pool of connections to postgres db host
+    * usage example:
+        async with AsyncPGClass(host, database, user, password, scheme) as client:
+            rows = await client.get_rows_by_keys("records", {"product_id": "some_id"})
+    """
+
+    def __init__(
+        self,
+        host,
+        database,
+        user,
+        password,
+        scheme,
+        port=5432,
+        min_pool_size=1,
+        max_pool_size=10,
+    ):
+        self.host = host
+        self.database = database
+        self.user = user
+        self.password = password
+        self.port = port
+        self.scheme = scheme
+        self.min_pool_size = min_pool_size
+        self.max_pool_size = max_pool_size
+        self.pool = None
+        self._column_types = {}
+
+    async def connect(self):
+        """
+        This method create the connections pool -> called automatically on "async with"
+        """
+        if self.pool:
+            return self
+        if asyncpg is None:
+            raise ImportError(
+                "asyncpg package is required for AsyncPGClass -> install it by: pip install asyncpg"
+            )
+        try:
+            self.pool = await asyncpg.create_pool(
+                host=self.host,
+                database=self.database,
+                user=self.user,
+                password=self.password,
+                port=self.port,
+                min_size=self.min_pool_size,
+                max_size=self.max_pool_size,
+            )
+        except Exception as e:
+            raise ConnectionError(f"Error on connection to DB with error: {str(e)}")
+        return self
+
+    async def close(self):
+        """
+        This method close all connections of the pool
+        """
+        if self.pool:
+            await self.pool.close()
+            self.pool = None
+
+    async def __aenter__(self):
+        return await self.connect()
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def _fetch(self, command, *args):
+        try:
+            return await self.pool.fetch(command, *args)
+        except Exception as e:
+            _log.error(str(e))
+            raise e
+
+    async def _execute(self, command, *args):
+        try:
+            return await self.pool.execute(command, *args)
+        except Exception as e:
+            _log.error(str(e))
+            raise e
+
+    async def gather(self, *coroutines):
+        """
+        This method run several queries concurrently (each on its own pool connection) and return results by order
+        :param coroutines: coroutines of this class queries -> client.get_rows_by_keys(...), client.polygon...
+        :return: list of results
+        """
+        return await asyncio.gather(*coroutines)
+
+    async def command_execute(self, commands):
+        """
+        This method execute list of commands on single transaction
+        """
+        try:
+            async with self.pool.acquire() as conn:
+                async with conn.transaction():
+                    for command in commands:
+                        await conn.execute(command)
+        except Exception as e:
+            _log.error(str(e))
+            raise e
+
+    async def get_column_by_name(self, table_name, column_name):
+        """
+        This method return list of column data by providing column name
+        """
+        command = f"""SELECT "{column_name}" FROM "{self.scheme}"."{table_name}";"""
+        res = await self._fetch(command)
+        return [var[0] for var in res]
+
+    async def polygon_to_geojson(self, column, table_name, pk, pk_value, pk_type=None):
+        """
+        This method query for geometry object and return as geojson format readable
+        * pk_value bound as text and cast to pk type -> same values accepted as PGClass (e.g. str for int pk)
+        :param pk_type: str -> sql type of pk column, queried from db catalog if not provided
+        """
+        if not pk_type:
+            pk_type = await self._get_column_type(table_name, pk)
+        command = f"""select st_AsGeoJSON("{column}") from "{self.scheme}"."{table_name}" where "{pk}" = $1::text::{pk_type};"""
+        res = await self._fetch(command, str(pk_value))
+        return [tuple(r) for r in res]
+
+    async def delete_row_by_id(self, table_name, pk, pk_value, pk_type=None):
+        """
+        Delete entire row by providing key and value [primary key]
+        * pk_value bound as text and cast to pk type -> same values accepted as PGClass (e.g. str for int pk)
+        :param pk_type: str -> sql type of pk column, queried from db catalog if not provided
+        :return: status message -> "DELETE <n>"
+        """
+        if not pk_type:
+            pk_type = await self._get_column_type(table_name, pk)
+        command = f"""delete from "{self.scheme}"."{table_name}" where "{pk}" = $1::text::{pk_type};"""
+        return await self._execute(command, str(pk_value))
+
+    async def get_by_json_key(self, table_name, pk, canonic_keys, value):
+        """
+        This method send query with canonic search over json column and return rows include value:
+            Sample: the canonic =====> root_key->some_sub_key->optional_sub_key......-><value expected>
+        :param table_name: table name
+        :param pk: json column name
+        :param canonic_keys: list of arguments represent dict canonic order of keys
+        :param value: key name expected on the end of canonic path
+        """
+        search_str = postgres._json_path_expression(pk, canonic_keys)
+        command = (
+            f"""select * from "{self.scheme}"."{table_name}" where {search_str} ? $1;"""
+        )
+        res = await self._fetch(command, value)
+        return [tuple(r) for r in res]
+
+    async def _get_column_type(self, table_name, column):
+        """
+        This method return sql type of column from db catalog, cached per table-column
+        """
+        key = (table_name, column)
+        if key not in self._column_types:
+            command = """select format_type(a.atttypid, a.atttypmod) from pg_attribute a
+            where a.attrelid = $1::text::regclass and a.attname = $2 and not a.attisdropped"""
+            res = await self._fetch(command, f'"{self.scheme}"."{table_name}"', column)
+            if not res:
+                raise ValueError(
+                    f"Column [{column}] not found on table [{self.scheme}.{table_name}]"
+                )
+            self._column_types[key] = res[0][0]
+        return self._column_types[key]
+
+    async def get_by_n_argument(self, table_name, pk, pk_values, column, pk_type=None):
+        """
+        This method send query with multiple number of pk arguments bound as single array parameter
+        :param table_name: table name
+        :param pk: primary key
+        :param pk_values: list of arguments
+        :param column: column name to get
+        :param pk_type: str -> sql type of pk column, queried from db catalog if not provided
+        """
+        values = list(dict.fromkeys(str(value) for value in pk_values))
+        if not values:
+            return []
+        if not pk_type:
+            pk_type = await self._get_column_type(table_name, pk)
+        command = f"""select "{column}" from "{self.scheme}"."{table_name}" where "{pk}" = ANY($1::text[]::{pk_type}[])"""
+        res = await self._fetch(command, values)
+        return [r[0] for r in res]
+
+    async def update_multi_with_multi(
+        self, table_name, pk, column, values, type_pk, type_col
+    ):
+        """
+        Update multiple rows -> statements are pipelined on single connection by executemany
+        :param values: list of tuples -> [(pk_value, column_value)]
+        :param type_pk: sql type of pk column
+        :param type_col: sql type of updated column
+        """
+        command = (
+            f"""update "{self.scheme}"."{table_name}" set "{column}" = $2::text::{type_col} """
+            f"""where "{pk}" = $1::text::{type_pk};"""
+        )
+        args = [(str(v[0]), str(v[1])) for v in values]
+        try:
+            async with self.pool.acquire() as conn:
+                async with conn.transaction():
+                    await conn.executemany(command, args)
+        except Exception as e:
+            _log.error(str(e))
+            raise e
+
+    async def get_rows_by_keys(
+        self,
+        table_name,
+        keys_values,
+        order_key=None,
+        order_desc=False,
+        return_as_dict=False,
+    ):
+        """
+        This method returns rows that suitable on several keys-values
+        * values are bound as query parameters -> should be provided with python type fit to column type
+        :param table_name: table name
+        :param keys_values: dict with columns keys values
+        :param order_key: str of key for ordering query - not mendatory
+        :param order_desc: order method - not mendatory as default ASC
+        :param return_as_dict: bool -> if return the result as dict or list
+        """
+        key_value_stat = []
+        args = []
+        for idx, (key, val) in enumerate(keys_values.items(), start=1):
+            key_value_stat.append(f""""{key}" = ${idx}""")
+            args.append(val)
+        key_value_stat = """ and """.join(key_value_stat)
+
+        command = (
+            f"""select * from "{self.scheme}"."{table_name}" where ({key_value_stat})"""
+        )
+        if order_key:
+            asc_desc = "asc" if not order_desc else "desc"
+            command = command + f""" order by "{order_key}" {asc_desc}"""
+
+        res = await self._fetch(command, *args)
+        if return_as_dict:
+            return [dict(row) for row in res]
+        return [tuple(row) for row in res]
@@ -14,21 +14,44 @@ _log = logging.getLogger("mc_automation_tools.requests")
 # ToDo : Change Logic ?
 
 
+def create_session(pool_size=10, verify=None):
+    """
+    This method create requests session with connections pool -> reuse connections (keep-alive) between requests
+    :param pool_size: int -> max connections kept open per host (should fit number of concurrent threads)
+    :param verify: cert dir for ssl verification -> config.CERT_DIR as default
+    :return: requests.Session
+    """
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(
+        pool_connections=pool_size, pool_maxsize=pool_size
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    verify = verify or config.CERT_DIR
+    if verify:
+        session.verify = verify
+    return session
+
+
 def send_post_binary_request(
     url,
     data={},
     header={"content-type": "application/json", "accept": "*/*"},
     params=None,
+    session=None,
 ):
     """
     This method will execute similar post http request execution but,
     dedicated send request with binary data (images and etc.)
     send http post request by providing post full url + body ,
     header is optional, by default:content-type': 'application/json', "accept": "*/*
+    session is optional -> requests.Session (see create_session) to reuse its connections
     """
 
     try:
-        if not config.CERT_DIR:
+        if session is not None:
+            resp = session.post(url=url, data=data, headers=header, params=params)
+        elif not config.CERT_DIR:
             resp = requests.post(url=url, data=data, headers=header, params=params)
         else:
             resp = requests.post(
@@ -83,19 +106,22 @@ def send_post_request(url, body={}, header=None, params=None):
     return resp
 
 
-def send_get_request(url, params=None, header=None):
+def send_get_request(url, params=None, header=None, session=None):
     """
     send http get request by providing get full url
     :param url: url to get request
     :param params: json with key-value of query params
     :headers param: if exists you can use the headers
+    :param session: requests.Session (see create_session) to reuse its connections - optional
     :return: http response data as request library returns
     """
     common.url_validator(url)
     if header is None:
         header = {"content-type": "application/json"}
     try:
-        if not config.CERT_DIR:
+        if session is not None:
+            resp = session.get(url, params=params, timeout=120, headers=header)
+        elif not config.CERT_DIR:
             resp = requests.get(url, params, headers=header)
         else:
             resp = requests.get(
@@ -7,8 +7,10 @@ import logging
 import os
 import posixpath
 import re
+import threading
 import time
 import uuid
+from concurrent import futures
 
 import requests
 import xmltodict
@@ -114,6 +116,93 @@ def generate_unique_fingerprint(bytes_array):
     return finger_print_str
 
 
+def calculate_percentiles(values, percentiles=(50, 90, 95, 99)):
+    """
+    This method calculate percentiles of values list with linear interpolation between closest ranks
+    :param values: list of numbers
+    :param percentiles: percentiles to calculate -> numbers between 0 - 100
+    :return: dict -> {"p50": value, "p90": value...}, values are None if provided list is empty
+    """
+    ordered = sorted(values)
+    results = {}
+    for percentile in percentiles:
+        key = f"p{percentile:g}"
+        if not ordered:
+            results[key] = None
+            continue
+        rank = (len(ordered) - 1) * percentile / 100
+        low = int(rank)
+        high = min(low + 1, len(ordered) - 1)
+        results[key] = ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+    return results
+
+
+def parse_iso_datetime(time_str):
+    """
+    This method convert ISO-8601 time string (as returned by services -> "2021-12-01T15:14:45.283Z") to datetime
+    """
+    if time_str.endswith("Z"):
+        time_str = time_str[:-1] + "+00:00"
+    return datetime.datetime.fromisoformat(time_str)
+
+
+def run_concurrently(func, args_list, max_workers=8):
+    """
+    This method run function over list of arguments with bounded number of concurrent threads
+    * failure of single item not stop others -> error is recorded on its result
+    :param func: callable to run
+    :param args_list: list of tuples -> positional arguments for each call
+    :param max_workers: int -> max concurrent calls
+    :return: list of dicts ordered as args_list -> {index, success, result, error, duration}
+    """
+
+    def _run(index, args):
+        start = time.time()
+        try:
+            result = {"index": index, "success": True, "result": func(*args)}
+            result["error"] = None
+        except Exception as e:
+            _log.error(
+                f"[run_concurrently]: call [{index}] failed with error: {str(e)}"
+            )
+            result = {"index": index, "success": False, "result": None}
+            result["error"] = str(e)
+        result["duration"] = time.time() - start
+        return result
+
+    if not args_list:
+        return []
+    with futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(_run, range(len(args_list)), args_list))
+
+
+class RateLimiter:
+    """
+    This class limit rate of operations (per second) shared between threads -> acquire() block until allowed
+    """
+
+    def __init__(self, rate):
+        """
+        :param rate: float -> max operations per second, None or 0 -> unlimited
+        """
+        self.rate = rate
+        self._lock = threading.Lock()
+        self._next_time = time.time()
+
+    def acquire(self):
+        """
+        This method wait until next operation is allowed by rate
+        """
+        if not self.rate:
+            return
+        with self._lock:
+            now = time.time()
+            wait = self._next_time - now
+            self._next_time = max(self._next_time, now) + 1.0 / self.rate
+        if wait > 0:
+            time.sleep(wait)
+
+
 def get_environment_variable(name, default_val):
     # (str, object) -> object
     """
@@ -33,11 +33,14 @@ class ResponseCode(enum.Enum):
     Ok = 200  # server return ok status
     ChangeOk = 201  # server was return ok for changing
     NoJob = 204  # No job
+    NotModified = 304  # conditional request - data not changed since provided etag
     ValidationErrors = 400  # bad request
     StatusNotFound = 404  # status\es not found on db
     DuplicatedError = 409  # in case of requesting package with same name already exists
     GetwayTimeOut = 504  # some server didn't respond
     ServerError = 500  # problem with error
+    BadGateway = 502  # proxy got invalid response from upstream server
+    ServiceUnavailable = 503  # server overloaded or down for maintenance
 
 
 class JobStatus(enum.Enum):
@@ -87,6 +90,47 @@ query jobs ($params: JobsSearchParams){
 										}
 """
 
+JOB_QUERY = """
+query jobs ($params: JobsSearchParams){
+  jobs(params: $params) {
+                id
+                resourceId
+                version
+                isCleaned
+                status
+                reason
+                type
+                created
+  						 }
+										}
+"""
+
+JOB_TASK_COUNT_QUERY = """
+query jobs ($params: JobsSearchParams){
+  jobs(params: $params) {
+                id
+                resourceId
+                version
+                isCleaned
+                status
+                reason
+                type
+                created
+    			tasks {
+                status
+              			}
+  						 }
+										}
+"""
+
+# fields selection presets of jobs queries -> "jobs_task_counts" replace tasks list with counts per status
+# ("jobs_task_counts" still select status of every task, counts are calculated on client side)
+JOB_QUERY_PRESETS = {
+    "jobs": JOB_QUERY,
+    "jobs_tasks": JOB_TASK_QUERY,
+    "jobs_task_counts": JOB_TASK_COUNT_QUERY,
+}
+
 # mapping of zoom level and related resolution values
 zoom_level_dict = {
     0: 0.703125,
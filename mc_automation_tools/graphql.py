@@ -1,10 +1,19 @@
 """
 This module wrap and provide pytonic client interface to integrate with graphql server
 """
+import asyncio
+import copy
+import json
 import logging
+import re
+import threading
 import time
+from collections import OrderedDict
 
-# from mc_automation_tools import common
+import aiohttp
+import requests
+import websockets
+from mc_automation_tools import base_requests, common
 from mc_automation_tools.configuration import config
 from python_graphql_client import GraphqlClient
 
@@ -13,23 +22,334 @@ from python_graphql_client import GraphqlClient
 _log = logging.getLogger("graphql_handler")
 
 
+class GqlSessionTransport:
+    """
+    This class is gql transport with persistent connections -> same execute api as GraphqlClient, but http requests
+    reuse pooled session (keep-alive) and async requests reuse single aiohttp session
+    """
+
+    def __init__(self, endpoint, verify=None, pool_size=10, headers=None):
+        self.endpoint = endpoint
+        self.headers = headers or {}
+        self.verify = verify
+        self.session = base_requests.create_session(pool_size, verify=verify)
+        self._async_session = None
+
+    @staticmethod
+    def _request_body(query, variables=None, operation_name=None):
+        body = {"query": query}
+        if variables:
+            body["variables"] = variables
+        if operation_name:
+            body["operationName"] = operation_name
+        return body
+
+    def execute(
+        self, query, variables=None, operation_name=None, headers=None, **kwargs
+    ):
+        """
+        This method send query over pooled session -> kwargs (as verify) are ignored, set on session creation
+        """
+        resp = self.session.post(
+            self.endpoint,
+            json=self._request_body(query, variables, operation_name),
+            headers={**self.headers, **(headers or {})},
+        )
+        resp.raise_for_status()
+        return resp.json()
+
+    async def execute_async(
+        self, query, variables=None, operation_name=None, headers=None
+    ):
+        """
+        This method send query over persistent aiohttp session (created on first call, on running event loop)
+        """
+        if self._async_session is None or self._async_session.closed:
+            ssl = None
+            if isinstance(self.verify, str):
+                import ssl as ssl_lib
+
+                ssl = ssl_lib.create_default_context(cafile=self.verify)
+            self._async_session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(ssl=ssl)
+            )
+        async with self._async_session.post(
+            self.endpoint,
+            json=self._request_body(query, variables, operation_name),
+            headers={**self.headers, **(headers or {})},
+        ) as resp:
+            resp.raise_for_status()
+            return await resp.json()
+
+    async def close_async(self):
+        """
+        This method close the aiohttp session -> should be awaited on the same event loop that used it
+        """
+        if self._async_session is not None:
+            await self._async_session.close()
+            self._async_session = None
+
+    def close(self):
+        """
+        This method close the pooled http session
+        """
+        self.session.close()
+
+
+class GqlResponseCache:
+    """
+    This class is in memory cache of gql query responses with ttl and max entries (least recently used dropped)
+    * key is normalized query text (whitespace collapsed) + variables (sorted json), mutations are never cached
+    * responses are deep copied on set and get -> callers can't modify cached responses
+    """
+
+    def __init__(self, ttl=30, max_entries=256):
+        """
+        :param ttl: float -> seconds cached response is valid
+        :param max_entries: int -> max cached responses
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(query, variables=None):
+        """
+        This method return cache key of query and variables
+        """
+        normalized = re.sub(r"\s+", " ", query or "").strip()
+        return normalized, json.dumps(variables or {}, sort_keys=True, default=str)
+
+    @staticmethod
+    def is_cacheable(query):
+        """
+        This method return False for mutations and subscriptions -> only idempotent queries are cached
+        """
+        return not re.match(r"\s*(mutation|subscription)\b", query or "")
+
+    def get(self, query, variables=None):
+        """
+        This method return cached response or None if missing or expired
+        """
+        key = self.make_key(query, variables)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.time() - entry[0] > self.ttl:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return copy.deepcopy(entry[1])
+
+    def set(self, query, variables, response):
+        """
+        This method cache response of query -> responses with errors are not cached
+        """
+        if not self.is_cacheable(query) or (
+            isinstance(response, dict) and response.get("errors")
+        ):
+            return
+        key = self.make_key(query, variables)
+        with self._lock:
+            self._entries[key] = (time.time(), copy.deepcopy(response))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, query=None, variables=None):
+        """
+        This method remove cached responses:
+            query + variables -> single entry, query only -> all entries of the query, nothing -> all entries
+        """
+        with self._lock:
+            if query is None:
+                self._entries.clear()
+                return
+            key = self.make_key(query, variables)
+            if variables is not None:
+                self._entries.pop(key, None)
+                return
+            for cached_key in [k for k in self._entries if k[0] == key[0]]:
+                del self._entries[cached_key]
+
+    def stats(self):
+        """
+        This method return cache counters -> {entries, hits, misses}
+        """
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
 class GqlClient:
     """This class wrapping and provide access into gql server"""
 
-    def __init__(self, host):
-        if config.CERT_DIR_GQL:
+    def __init__(
+        self,
+        host,
+        pooled=False,
+        pool_size=10,
+        ws_endpoint=None,
+        cache_ttl=None,
+        cache_max_entries=256,
+    ):
+        """
+        :param host: url of gql server
+        :param pooled: bool -> use GqlSessionTransport (persistent connections) instead of connection per query
+        :param pool_size: int -> max kept-alive connections on pooled mode
+        :param ws_endpoint: url of websocket endpoint for subscriptions -> host with ws scheme as default
+        :param cache_ttl: float -> seconds to cache queries responses (see GqlResponseCache), None -> no cache
+        :param cache_max_entries: int -> max cached responses
+        """
+        self.host = host
+        self.cache = (
+            GqlResponseCache(cache_ttl, cache_max_entries) if cache_ttl else None
+        )
+        self.ws_endpoint = ws_endpoint or host.replace("http", "ws", 1)
+        if pooled:
+            self.client = GqlSessionTransport(
+                host, verify=config.CERT_DIR_GQL, pool_size=pool_size
+            )
+        elif config.CERT_DIR_GQL:
             self.client = GraphqlClient(endpoint=host, verify=config.CERT_DIR_GQL)
         else:
             self.client = GraphqlClient(endpoint=host)
 
-    def execute_free_query(self, query=None, variables=None):
+    def execute_free_query(self, query=None, variables=None, use_cache=True):
         """
         This method will send query by providing entire query and variables -> variables by default <None>
+        :param use_cache: bool -> return cached response if client created with cache_ttl
         """
+        if use_cache and self.cache:
+            res = self.cache.get(query, variables)
+            if res is not None:
+                return res
         res = self.client.execute(query=query, variables=variables)
+        if self.cache:
+            self.cache.set(query, variables, res)
         return res
 
-    def get_jobs_tasks(self, query=config.JOB_TASK_QUERY, variables=None):
+    def invalidate_cache(self, query=None, variables=None):
+        """
+        This method remove cached responses (see GqlResponseCache.invalidate), nothing to do if cache disabled
+        """
+        if self.cache:
+            self.cache.invalidate(query, variables)
+
+    async def execute_async(self, query=None, variables=None):
+        """
+        This method send query without blocking the event loop
+        """
+        return await self.client.execute_async(query=query, variables=variables)
+
+    async def subscribe(self, query, handle, variables=None, init_payload=None):
+        """
+        This method subscribe to gql subscription over websocket (graphql-ws protocol) and call handle on each event
+        :param query: str -> subscription query
+        :param handle: callable -> called with payload of each event, if return True the subscription stopped
+        :param variables: dict -> subscription variables
+        :param init_payload: dict -> payload of connection_init message (e.g. auth token)
+        """
+        body = {"query": query}
+        if variables:
+            body["variables"] = variables
+        async with websockets.connect(
+            self.ws_endpoint, subprotocols=["graphql-ws"]
+        ) as websocket:
+            await websocket.send(
+                json.dumps({"type": "connection_init", "payload": init_payload or {}})
+            )
+            await websocket.send(
+                json.dumps({"type": "start", "id": "1", "payload": body})
+            )
+            async for message in websocket:
+                message = json.loads(message)
+                if message["type"] in ("connection_ack", "ka"):
+                    continue
+                if message["type"] in ("error", "connection_error"):
+                    raise Exception(
+                        f"gql subscription failed with error: [{message.get('payload')}]"
+                    )
+                if message["type"] == "complete":
+                    return
+                if handle(message["payload"]):
+                    await websocket.send(json.dumps({"type": "stop", "id": "1"}))
+                    return
+
+    async def subscribe_or_poll(
+        self,
+        handle,
+        subscription_query=None,
+        variables=None,
+        poll_query=None,
+        poll_variables=None,
+        poll_interval=5,
+    ):
+        """
+        This method follow changes by websocket subscription, if subscription not provided or failed ->
+        fall back to polling poll_query every poll_interval seconds and call handle only when result changed
+        :param handle: callable -> called with payload (data) of each change, if return True following stopped
+        :param subscription_query: str -> subscription query, e.g. job status changes
+        :param poll_query: str -> query used on polling fallback, e.g. config.JOB_QUERY
+        :param poll_interval: float -> seconds between polls on fallback
+        """
+        if subscription_query:
+            try:
+                await self.subscribe(subscription_query, handle, variables)
+                return
+            except Exception as e:
+                _log.warning(
+                    f"gql subscription failed with error: [{str(e)}], falling back to polling"
+                )
+        if not poll_query:
+            raise ValueError("poll_query should be provided for polling fallback")
+
+        last = None
+        while True:
+            res = await self.execute_async(query=poll_query, variables=poll_variables)
+            if res != last:
+                last = res
+                if handle(res):
+                    return
+            await asyncio.sleep(poll_interval)
+
+    def follow_changes(self, handle, timeout=None, **kwargs):
+        """
+        This method is blocking wrapper of subscribe_or_poll for sync code
+        :param timeout: float -> max seconds to follow, None -> until handle return True
+        :param kwargs: arguments of subscribe_or_poll
+        """
+
+        async def _follow():
+            try:
+                await asyncio.wait_for(
+                    self.subscribe_or_poll(handle, **kwargs), timeout
+                )
+            except asyncio.TimeoutError:
+                _log.warning(
+                    f"Stop following gql changes after timeout [{timeout}] sec"
+                )
+            finally:
+                if isinstance(self.client, GqlSessionTransport):
+                    await self.client.close_async()
+
+        asyncio.run(_follow())
+
+    def get_jobs_tasks(
+        self, query=config.JOB_TASK_QUERY, variables=None, use_cache=True
+    ):
+        if use_cache and self.cache:
+            res = self.cache.get(query, variables)
+            if res is not None:
+                return res
         retry = 3
         failure_resaon = ""
         for i in range(retry):
@@ -40,6 +360,8 @@ class GqlClient:
                     )
                 else:
                     res = self.client.execute(query=query, variables=variables)
+                if self.cache:
+                    self.cache.set(query, variables, res)
                 return res
             except Exception as e:
                 _log.debug(f"failure on connection with error [{str(e)}]")
@@ -50,3 +372,95 @@ class GqlClient:
             f"Failed access to gql after {i+1} / {retry} tries, with message: [{failure_resaon}]"
         )
         # return res
+
+    def iter_jobs(
+        self,
+        params=None,
+        preset="jobs",
+        page_size=100,
+        offset_key="from",
+        limit_key="size",
+    ):
+        """
+        This generator query jobs page by page and yield jobs one by one
+        * paging values are sent inside $params variable -> {offset_key: offset, limit_key: page_size}
+        :param params: dict -> JobsSearchParams filters (resourceId, status, type...)
+        :param preset: str -> fields selection from config.JOB_QUERY_PRESETS:
+            "jobs" - jobs fields only, "jobs_tasks" - jobs with tasks id + status,
+            "jobs_task_counts" - jobs with "taskCounts" dict {status: count} instead of tasks
+            * "jobs_task_counts" still download status of every task (gql schema has no counts field) ->
+              it save only tasks ids and client side tasks lists, not the tasks payload of the server
+        :param page_size: int -> jobs per request
+        :param offset_key: str -> name of offset field on JobsSearchParams
+        :param limit_key: str -> name of page size field on JobsSearchParams
+        :return: generator of jobs dicts
+        """
+        query = config.JOB_QUERY_PRESETS[preset]
+        offset = 0
+        previous_ids = None
+        while True:
+            page_params = dict(params or {})
+            page_params[offset_key] = offset
+            page_params[limit_key] = page_size
+            res = self.get_jobs_tasks(query=query, variables={"params": page_params})
+            if res.get("errors"):
+                raise Exception(f"Failed query jobs with errors: [{res['errors']}]")
+            jobs = res["data"]["jobs"] or []
+            page_ids = [job.get("id") for job in jobs]
+            if jobs and page_ids == previous_ids:
+                _log.warning(
+                    f"gql server return same jobs for offset [{offset}] -> "
+                    f"paging params [{offset_key}, {limit_key}] not supported, stop paging"
+                )
+                return
+            previous_ids = page_ids
+            for job in jobs:
+                if preset == "jobs_task_counts":
+                    counts = _count_tasks_by_status(job.get("tasks"))
+                    job = {key: value for key, value in job.items() if key != "tasks"}
+                    job["taskCounts"] = counts
+                yield job
+
+            if len(jobs) > page_size:
+                _log.warning(
+                    f"gql server return [{len(jobs)}] jobs for page size of [{page_size}] -> "
+                    f"paging params [{offset_key}, {limit_key}] not supported, stop paging"
+                )
+                return
+            if len(jobs) < page_size:
+                return
+            offset += page_size
+
+    def execute_batch(self, operations):
+        """
+        This method send several queries on single http request (batched body as list of operations)
+        * gql server should support batching (as apollo server)
+        :param operations: list of tuples -> [(query, variables)]
+        :return: list of results -> dict per operation, ordered as operations
+        """
+        body = [
+            {"query": query, "variables": variables} for query, variables in operations
+        ]
+        kwargs = {"verify": config.CERT_DIR_GQL} if config.CERT_DIR_GQL else {}
+        resp = requests.post(self.host, json=body, **kwargs)
+        status_code, content = common.response_parser(resp)
+        if status_code != config.ResponseCode.Ok.value:
+            raise Exception(
+                f"[execute_batch]:failed send batch of [{len(operations)}] queries, "
+                f"return with error:[{status_code}],error msg:[{content}]"
+            )
+        if not isinstance(content, list):
+            raise Exception(
+                f"[execute_batch]:gql server not support batching, response: [{content}]"
+            )
+        return content
+
+
+def _count_tasks_by_status(tasks):
+    """
+    This function convert list of tasks into dict of counters -> {status: count}
+    """
+    counts = {}
+    for task in tasks or []:
+        counts[task["status"]] = counts.get(task["status"], 0) + 1
+    return counts
@@ -1,7 +1,14 @@
 """This module will wrap access for azure's pv that raster ingestion based on - not for production testing"""
+import logging
+import time
+
 from mc_automation_tools import base_requests, common
 from mc_automation_tools.configuration import config
 
+_log = logging.getLogger("mc_automation_tools.ingestion_api.azure_pvc_api")
+
+PROVISION_STEPS = ("create", "make_unique", "change_max_zoom", "validate")
+
 
 class PVCHandler:
     """This is wrapper interface for pvc automation service"""
@@ -107,7 +114,7 @@ class PVCHandler:
         resp = base_requests.send_get_request(url, param)
         return resp
 
-    def delete_file_from_folder(self, folder_name, file_name):
+    def delete_file_from_folder(self, folder_name, file_name, session=None):
         """
         This function will delete ingestion test dir
         """
@@ -116,10 +123,10 @@ class PVCHandler:
             self.__end_point_url,
             self.__deleteFromFolder,
         )
-        resp = base_requests.send_get_request(url, param)
+        resp = base_requests.send_get_request(url, param, session=session)
         return resp
 
-    def create_mock_file(self, folder_name, file_name):
+    def create_mock_file(self, folder_name, file_name, session=None):
         """
         This function will create file in folder
         """
@@ -128,10 +135,10 @@ class PVCHandler:
             self.__end_point_url,
             self.__createMockFile,
         )
-        resp = base_requests.send_get_request(url, param)
+        resp = base_requests.send_get_request(url, param, session=session)
         return resp
 
-    def copy_file_to_dest(self, src_folder, dest_folder):
+    def copy_file_to_dest(self, src_folder, dest_folder, session=None):
         """
         This function will create file in folder
         """
@@ -140,5 +147,173 @@ class PVCHandler:
             self.__end_point_url,
             self.__copyFile,
         )
-        resp = base_requests.send_get_request(url, param)
+        resp = base_requests.send_get_request(url, param, session=session)
         return resp
+
+    # ============================================ bulk file operations ================================================
+    def _run_bulk(self, name, func, items, max_workers):
+        """
+        This method send func request for each item concurrently over single pooled session and aggregate results
+        :return: dict -> {total, succeeded, failed, duration, results: [{item, status_code, error, duration}]}
+        """
+        session = base_requests.create_session(pool_size=max_workers)
+
+        def _send(*item):
+            resp = func(*item, session=session)
+            if resp.status_code != config.ResponseCode.Ok.value:
+                raise Exception(
+                    f"[{name}]:failed on {item}, return with error:[{resp.status_code}],"
+                    f"error msg:[{str(resp.content)}]"
+                )
+            return resp.status_code
+
+        start = time.time()
+        try:
+            runs = common.run_concurrently(
+                _send, [tuple(item) for item in items], max_workers=max_workers
+            )
+        finally:
+            session.close()
+        results = [
+            {
+                "item": tuple(item),
+                "status_code": run["result"],
+                "error": run["error"],
+                "duration": run["duration"],
+            }
+            for item, run in zip(items, runs)
+        ]
+        succeeded = sum(run["success"] for run in runs)
+        summary = {
+            "total": len(results),
+            "succeeded": succeeded,
+            "failed": len(results) - succeeded,
+            "duration": time.time() - start,
+            "results": results,
+        }
+        _log.info(
+            f"[{name}]: [{succeeded} / {len(results)}] succeeded in [{summary['duration']:.2f}] sec"
+        )
+        return summary
+
+    def delete_files_from_folders(self, files, max_workers=8):
+        """
+        This method delete many files concurrently
+        :param files: list of tuples -> [(folder_name, file_name)]
+        :param max_workers: int -> max concurrent requests
+        :return: dict -> {total, succeeded, failed, duration, results: [{item, status_code, error, duration}]}
+        """
+        return self._run_bulk(
+            "delete_files_from_folders",
+            self.delete_file_from_folder,
+            files,
+            max_workers,
+        )
+
+    def create_mock_files(self, files, max_workers=8):
+        """
+        This method create many mock files concurrently
+        :param files: list of tuples -> [(folder_name, file_name)]
+        :param max_workers: int -> max concurrent requests
+        :return: dict -> {total, succeeded, failed, duration, results: [{item, status_code, error, duration}]}
+        """
+        return self._run_bulk(
+            "create_mock_files", self.create_mock_file, files, max_workers
+        )
+
+    def copy_files_to_dest(self, copies, max_workers=8):
+        """
+        This method copy many files or folders concurrently
+        :param copies: list of tuples -> [(src_folder, dest_folder)]
+        :param max_workers: int -> max concurrent requests
+        :return: dict -> {total, succeeded, failed, duration, results: [{item, status_code, error, duration}]}
+        """
+        return self._run_bulk(
+            "copy_files_to_dest", self.copy_file_to_dest, copies, max_workers
+        )
+
+    # ============================================== provisioning ======================================================
+    def provision_ingestion_dir(self, required_zoom=4):
+        """
+        This method prepare ingestion directory as single pipeline -> create, make unique, set max zoom, validate
+        * pipeline stop on first step that not return ok status
+        :param required_zoom: int -> zoom level for change_max_zoom_tfw
+        :return: dict -> {success, failed_step, error, duration, steps: {step: {status_code, duration}}, data}
+            data -> json content of validate step response
+        """
+        steps = {
+            "create": self.create_new_ingestion_dir,
+            "make_unique": self.make_unique_shapedata,
+            "change_max_zoom": lambda: self.change_max_zoom_tfw(required_zoom),
+            "validate": self.validate_ingestion_directory,
+        }
+        result = {"success": True, "failed_step": None, "error": None, "steps": {}}
+        start = time.time()
+        for name in PROVISION_STEPS:
+            step_start = time.time()
+            try:
+                resp = steps[name]()
+                status_code, content = common.response_parser(resp)
+            except Exception as e:
+                status_code, content = None, str(e)
+            result["steps"][name] = {
+                "status_code": status_code,
+                "duration": time.time() - step_start,
+            }
+            if status_code != config.ResponseCode.Ok.value:
+                result["success"] = False
+                result["failed_step"] = name
+                result["error"] = (
+                    f"[provision_ingestion_dir]:failed on step [{name}], "
+                    f"return with error:[{status_code}],error msg:[{content}]"
+                )
+                _log.error(result["error"])
+                break
+            if name == "validate":
+                result["data"] = content
+        result["duration"] = time.time() - start
+        return result
+
+
+def provision_ingestion_dirs(pvc_handlers, required_zoom=4, max_workers=8):
+    """
+    This function prepare ingestion directories concurrently -> pipeline of provision_ingestion_dir per handler
+    * pvc service steps act on the directory configured on service (watch or test dir), so each handler
+      should target its own directory -> different pvc service endpoint or watch and not watch dirs of same service
+    :param pvc_handlers: list of PVCHandler instances
+    :param required_zoom: int -> zoom level for change_max_zoom_tfw
+    :param max_workers: int -> max concurrent pipelines
+    :return: dict -> {total, succeeded, duration, steps: {step: {count, mean, max, p50, p90...}}, results: [...]}
+    """
+    start = time.time()
+    runs = common.run_concurrently(
+        lambda handler: handler.provision_ingestion_dir(required_zoom),
+        [(handler,) for handler in pvc_handlers],
+        max_workers=max_workers,
+    )
+    results = [run["result"] for run in runs]
+    steps = {}
+    for name in PROVISION_STEPS:
+        durations = [
+            res["steps"][name]["duration"] for res in results if name in res["steps"]
+        ]
+        if not durations:
+            continue
+        steps[name] = {
+            "count": len(durations),
+            "mean": sum(durations) / len(durations),
+            "max": max(durations),
+        }
+        steps[name].update(common.calculate_percentiles(durations))
+    summary = {
+        "total": len(results),
+        "succeeded": sum(res["success"] for res in results),
+        "duration": time.time() - start,
+        "steps": steps,
+        "results": results,
+    }
+    _log.info(
+        f"Provisioned [{summary['succeeded']} / {summary['total']}] ingestion directories "
+        f"in [{summary['duration']:.2f}] sec"
+    )
+    return summary
@@ -0,0 +1,299 @@
+"""
+This module provide end to end latency benchmark of raster ingestion -> from agent manual trigger to layer visible
+on catalog (pycsw) and mapproxy. Milestones of each ingestion (seconds since trigger):
+    job_created - job of the product found on job manager
+    first_task - first task of the job created
+    tiling_start - first task seen In-Progress (or already finished)
+    job_finished - job status Completed \\ Failed
+    catalog_visible - record of the product returned from pycsw
+    mapproxy_visible - layer of the product valid on mapproxy (only if mapproxy handler provided)
+and tiling_duration - first task creation to last task update, by job manager timestamps (same server clock)
+* milestones observed by polling -> resolution is poll_interval
+"""
+import json
+import logging
+import time
+
+from mc_automation_tools import common
+from mc_automation_tools.configuration import config
+
+_log = logging.getLogger("mc_automation_tools.ingestion_api.ingestion_benchmark")
+
+MILESTONES = (
+    "trigger",
+    "job_created",
+    "first_task",
+    "tiling_start",
+    "job_finished",
+    "tiling_duration",
+    "catalog_visible",
+    "mapproxy_visible",
+)
+
+
+class IngestionLatencyBenchmark:
+    """
+    This class run ingestions and measure trigger to catalog latency milestones of each one
+    * usage example:
+        benchmark = IngestionLatencyBenchmark(DiscreteAgentApi(agent_url), JobsTasksManager(job_manager_url),
+                                              PycswHandler(pycsw_url), pycsw_params)
+        benchmark.run([{"source_directory": "watch/1", "product_id": "id_1", "product_version": "1.0"}, ...])
+        benchmark.export_json("/tmp/ingestion_latency.json")
+    """
+
+    def __init__(
+        self,
+        agent,
+        job_manager,
+        pycsw_handler,
+        pycsw_params,
+        mapproxy_handler=None,
+        job_type="Discrete-Tiling",
+        poll_interval=2,
+        timeout=1800,
+        header=None,
+        token=None,
+        clock_skew=5,
+    ):
+        """
+        :param agent: DiscreteAgentApi instance
+        :param job_manager: JobsTasksManager instance
+        :param pycsw_handler: PycswHandler instance
+        :param pycsw_params: dict -> GetRecords request parameters for PycswHandler.get_record_by_id
+        :param mapproxy_handler: MapproxyHandler instance -> None skip mapproxy_visible milestone
+        :param job_type: str -> type of ingestion job on job manager
+        :param poll_interval: float -> seconds between polls
+        :param timeout: float -> max seconds from trigger to last milestone of single ingestion
+        :param header: dict -> header for pycsw and mapproxy requests
+        :param token: str -> token for mapproxy requests
+        :param clock_skew: float -> seconds of tolerance between local clock and job manager clock, on matching job
+            created after the trigger
+        """
+        self.agent = agent
+        self.job_manager = job_manager
+        self.pycsw_handler = pycsw_handler
+        self.pycsw_params = pycsw_params
+        self.mapproxy_handler = mapproxy_handler
+        self.job_type = job_type
+        self.poll_interval = poll_interval
+        self.timeout = timeout
+        self.header = header
+        self.token = token
+        self.clock_skew = clock_skew
+        self.results = []
+
+    def _wait_for(self, name, check, t_end):
+        """
+        This method poll check() until it return not None value or timeout
+        """
+        while True:
+            try:
+                value = check()
+            except Exception as e:
+                _log.debug(f"[{name}]: poll failed with error: {str(e)}")
+                value = None
+            if value is not None:
+                return value
+            if time.time() + self.poll_interval > t_end:
+                raise TimeoutError(f"Got timeout while waiting for [{name}]")
+            time.sleep(self.poll_interval)
+
+    def _find_job(self, product_id, product_version, since):
+        """
+        This method return id of latest job of the product created at or after since (epoch seconds) -> None if missing
+        * jobs of previous ingestions of same product are ignored
+        """
+        jobs = self.job_manager.find_jobs_by_criteria(
+            {
+                "resourceId": product_id,
+                "version": product_version,
+                "type": self.job_type,
+                "shouldReturnTasks": "false",
+            }
+        )
+        created = {
+            job["id"]: common.parse_iso_datetime(job["created"]).timestamp()
+            for job in jobs
+        }
+        new_jobs = [
+            job_id for job_id in created if created[job_id] >= since - self.clock_skew
+        ]
+        return max(new_jobs, key=created.get) if new_jobs else None
+
+    def run_single(self, source_directory, product_id, product_version, layer_id=None):
+        """
+        This method trigger single ingestion and wait for all its milestones
+        :param source_directory: str -> directory to trigger ingestion from (agent manual trigger)
+        :param product_id: str -> product id of the ingested source
+        :param product_version: str -> product version of the ingested source
+        :param layer_id: str -> layer id for mapproxy validation, "productId-productVersion" as default
+        :return: dict -> {product_id, product_version, job_id, success, error, milestones: {milestone: seconds}}
+        """
+        result = {
+            "product_id": product_id,
+            "product_version": product_version,
+            "job_id": None,
+            "success": False,
+            "error": None,
+            "milestones": {},
+        }
+        milestones = result["milestones"]
+        start = time.time()
+        t_end = start + self.timeout
+        try:
+            resp = self.agent.post_manual_trigger(source_directory)
+            milestones["trigger"] = time.time() - start
+            if resp.status_code not in (
+                config.ResponseCode.Ok.value,
+                config.ResponseCode.ChangeOk.value,
+            ):
+                raise Exception(
+                    f"[run_single]:failed on manual trigger, return with error:[{resp.status_code}],"
+                    f"error msg:[{str(resp.content)}]"
+                )
+
+            job_id = self._wait_for(
+                "job_created",
+                lambda: self._find_job(product_id, product_version, start),
+                t_end,
+            )
+            result["job_id"] = job_id
+            milestones["job_created"] = time.time() - start
+
+            job = {}
+
+            def _job_state(condition):
+                job.update(self.job_manager.get_job_by_id(job_id))
+                return True if condition(job) else None
+
+            self._wait_for(
+                "first_task", lambda: _job_state(lambda j: j.get("tasks")), t_end
+            )
+            milestones["first_task"] = time.time() - start
+            self._wait_for(
+                "tiling_start",
+                lambda: _job_state(
+                    lambda j: any(
+                        task["status"] != config.JobStatus.Pending.value
+                        for task in j["tasks"]
+                    )
+                ),
+                t_end,
+            )
+            milestones["tiling_start"] = time.time() - start
+            self._wait_for(
+                "job_finished",
+                lambda: _job_state(
+                    lambda j: j["status"]
+                    in (config.JobStatus.Completed.value, config.JobStatus.Failed.value)
+                ),
+                t_end,
+            )
+            milestones["job_finished"] = time.time() - start
+            milestones["tiling_duration"] = _tiling_duration(job["tasks"])
+            if job["status"] != config.JobStatus.Completed.value:
+                raise Exception(
+                    f"[run_single]:job [{job_id}] finished with status [{job['status']}]"
+                )
+
+            records = self._wait_for(
+                "catalog_visible",
+                lambda: self.pycsw_handler.get_record_by_id(
+                    product_id, product_version, self.pycsw_params, self.header
+                )
+                or None,
+                t_end,
+            )
+            milestones["catalog_visible"] = time.time() - start
+
+            if self.mapproxy_handler:
+                layer_id = layer_id or "-".join([product_id, product_version])
+                self._wait_for(
+                    "mapproxy_visible",
+                    lambda: self.mapproxy_handler.validate_layer_from_pycsw(
+                        records,
+                        product_id,
+                        product_version,
+                        layer_id,
+                        header=self.header,
+                        token=self.token,
+                    )["validation"]
+                    or None,
+                    t_end,
+                )
+                milestones["mapproxy_visible"] = time.time() - start
+            result["success"] = True
+        except Exception as e:
+            result["error"] = str(e)
+            _log.error(
+                f"Ingestion benchmark of [{product_id}:{product_version}] failed with error: {str(e)}"
+            )
+        _log.info(
+            f"Ingestion [{product_id}:{product_version}] milestones:\n{json.dumps(milestones, indent=4)}"
+        )
+        self.results.append(result)
+        return result
+
+    def run(self, ingestions, max_workers=1):
+        """
+        This method run benchmark over list of ingestions
+        :param ingestions: list of dicts -> kwargs of run_single:
+            [{"source_directory": str, "product_id": str, "product_version": str, "layer_id": optional str}]
+        :param max_workers: int -> concurrent ingestions, 1 (default) -> one by one (not loaded system latency)
+        :return: dict -> report (see report)
+        """
+        common.run_concurrently(
+            lambda ingestion: self.run_single(**ingestion),
+            [(ingestion,) for ingestion in ingestions],
+            max_workers=max_workers,
+        )
+        return self.report()
+
+    def report(self, percentiles=(50, 90, 95, 99)):
+        """
+        This method return statistics of milestones across all ingestions runs
+        * failed ingestions contribute only the milestones they reached
+        :return: dict -> {runs, succeeded, milestones: {milestone: {count, min, mean, max, p50, p90...}}}
+        """
+        milestones = {}
+        for name in MILESTONES:
+            values = [
+                res["milestones"][name]
+                for res in self.results
+                if res["milestones"].get(name) is not None
+            ]
+            if not values:
+                continue
+            milestones[name] = {
+                "count": len(values),
+                "min": min(values),
+                "mean": sum(values) / len(values),
+                "max": max(values),
+            }
+            milestones[name].update(common.calculate_percentiles(values, percentiles))
+        return {
+            "runs": len(self.results),
+            "succeeded": sum(res["success"] for res in self.results),
+            "milestones": milestones,
+        }
+
+    def export_json(self, path):
+        """
+        This method write report + results of all runs as json file
+        :param path: str -> output file path
+        """
+        with open(path, "w") as fp:
+            json.dump({"report": self.report(), "results": self.results}, fp, indent=4)
+        return path
+
+
+def _tiling_duration(tasks):
+    """
+    This function return seconds from first task creation to last task update -> None if timestamps missing
+    """
+    try:
+        created = min(common.parse_iso_datetime(task["created"]) for task in tasks)
+        updated = max(common.parse_iso_datetime(task["updated"]) for task in tasks)
+    except (KeyError, TypeError, ValueError):
+        return None
+    return (updated - created).total_seconds()
@@ -10,6 +10,9 @@ from mc_automation_tools.configuration import config
 
 _log = logging.getLogger("mc_automation_tools.ingestion_api.job_manager_api")
 
+# job status is requested at least once per this number of tasks status polls
+JOB_STATUS_POLLS_RATIO = 10
+
 
 class JobsTasksManager:
     __jobs_api = "jobs"
@@ -25,6 +28,7 @@ class JobsTasksManager:
 
     def __init__(self, end_point_url):
         self.__end_point_url = end_point_url
+        self.__jobs_cache = {}
 
     @property
     def get_class_params(self):
@@ -253,6 +257,52 @@ class JobsTasksManager:
 
         return json.loads(resp.content)
 
+    def create_tasks(
+        self, uuid, bodies, max_workers=8, array_body=True, chunk_size=100
+    ):
+        """
+        This method insert many new tasks to job
+        * with array_body -> tasks are sent as list body (job manager create many tasks on single request),
+          by chunks of chunk_size tasks, chunks are sent concurrently
+        * without array_body -> request per task, sent concurrently
+        :param uuid: str -> unique id of job provided on creation
+        :param bodies: list[dict] -> bodies of new tasks (see create_task)
+        :param max_workers: int -> max concurrent requests
+        :param array_body: bool -> send tasks as list body
+        :param chunk_size: int -> number of tasks on each list body
+        :return: list of dicts ordered as bodies -> {index, success, result, error}
+            result is dict -> id: <new id of the created task>
+        """
+        if not array_body:
+            results = common.run_concurrently(
+                self.create_task, [(uuid, body) for body in bodies], max_workers
+            )
+        else:
+            chunks = [
+                bodies[idx : idx + chunk_size]
+                for idx in range(0, len(bodies), chunk_size)
+            ]
+            chunks_results = common.run_concurrently(
+                self.create_task, [(uuid, chunk) for chunk in chunks], max_workers
+            )
+            results = []
+            for chunk, chunk_result in zip(chunks, chunks_results):
+                ids = None
+                if chunk_result["success"] and isinstance(chunk_result["result"], dict):
+                    ids = chunk_result["result"].get("ids")
+                for idx in range(len(chunk)):
+                    result = dict(chunk_result, index=len(results))
+                    if ids and len(ids) == len(chunk):
+                        result["result"] = {"id": ids[idx]}
+                    results.append(result)
+
+        failed = sum(1 for result in results if not result["success"])
+        if failed:
+            _log.error(
+                f"[create_tasks]: failed insert [{failed}] / [{len(bodies)}] tasks to job [{uuid}]"
+            )
+        return results
+
     def get_task_by_task_id(self, job_id, task_id):
         """
         This method return task data by providing job-uuid and task-uuid
@@ -299,6 +349,26 @@ class JobsTasksManager:
 
         return resp.text
 
+    def update_tasks(self, job_id, updates, max_workers=8):
+        """
+        This method update many tasks of job concurrently (request per task)
+        :param job_id: uuid of related job
+        :param updates: list of tuples -> [(task_id, params)] -> params as on update_task_by_task_id
+        :param max_workers: int -> max concurrent requests
+        :return: list of dicts ordered as updates -> {index, success, result, error}
+        """
+        results = common.run_concurrently(
+            self.update_task_by_task_id,
+            [(job_id, task_id, params) for task_id, params in updates],
+            max_workers,
+        )
+        failed = sum(1 for result in results if not result["success"])
+        if failed:
+            _log.error(
+                f"[update_tasks]: failed update [{failed}] / [{len(updates)}] tasks of job [{job_id}]"
+            )
+        return results
+
     def delete_task_by_task_id(self, job_id, task_id):
         """
         This method delete task data by providing job-uuid and task-uuid
@@ -390,7 +460,7 @@ class JobsTasksManager:
         This method will retrieve the highest priority pending task and update its status to In-Progress.
         :param job_type: str -> the type of the job on job manager
         :param task_type: str -> the type of the task on job manager
-        :return: dict-> {
+        :return: None if there is no pending task [204], else dict-> {
                               "id": "3fa85f64-5717-4562-b3fc-2c963f66afa6",
                               "jobId": "3fa85f64-5717-4562-b3fc-2c963f66afa6",
                               "description": "string",
@@ -407,6 +477,8 @@ class JobsTasksManager:
             self.__end_point_url, self.__tasks, task_type, self.__start_pending
         )
         resp = base_requests.send_post_request(url)
+        if resp.status_code == config.ResponseCode.NoJob.value:
+            return None
         if resp.status_code != config.ResponseCode.Ok.value:
             raise Exception(
                 f"[start_pending]:failed find pending tasks , return with error:[{resp.status_code}]:error msg:[{str(resp.text)}]"
@@ -487,11 +559,26 @@ class JobsTasksManager:
         product_type="Discrete-Tiling",
         timeout=300,
         internal_timeout=80,
+        return_tasks=True,
+        min_interval=0.5,
     ):
-        """This method will follow running ingestion task and return results on finish"""
+        """
+        This method will follow running ingestion task and return results on finish
+        * polling is adaptive (see AdaptivePollInterval) -> starts fast, backs off while tasks progress is stalled
+          and speeds up as job approach completion. Each poll request only tasks status counters,
+          job status is requested when all tasks finished (or failed) or once per JOB_STATUS_POLLS_RATIO polls,
+          full tasks list is requested only once on finish
+        :param product_id: resourceId of the job
+        :param product_version: version of the job
+        :param product_type: type of the job
+        :param timeout: int -> max seconds to follow the job
+        :param internal_timeout: int -> max interval between polls is internal_timeout // 4
+        :param return_tasks: bool -> include tasks list of the job on results
+        :param min_interval: float -> min seconds between polls
+        :return: dict -> {status, message, job_id, tasks}
+        """
 
         t_end = time.time() + timeout
-        running = True
         find_job_params = {
             "resourceId": product_id,
             "version": product_version,
@@ -517,48 +604,386 @@ class JobsTasksManager:
             f'Num of tasks related to job: [{len(resp["tasks"])}]'
         )
         job = resp
+        job_id = job["id"]
+        total_tasks = len(job["tasks"])
+        poll_interval = AdaptivePollInterval(
+            min_interval=min_interval,
+            max_interval=max(internal_timeout // 4, min_interval),
+        )
+        status = job["status"]
+        reason = job["reason"]
+        polls = 0
+
+        while True:
+            tasks_status = self.get_all_tasks_status(job_id)
+            completed_task = tasks_status["completedTasksCount"]
+            failed_task = tasks_status["failedTasksCount"]
+            total_tasks = max(total_tasks, completed_task + failed_task)
+
+            polls += 1
+            if (
+                tasks_status["allTasksCompleted"]
+                or failed_task
+                or not polls % JOB_STATUS_POLLS_RATIO
+            ):
+                job = self.get_job_by_id(job_id, return_tasks=False)
+                status = job["status"]
+                reason = job["reason"]
 
-        while running:
-            time.sleep(internal_timeout // 4)
-            job_id = job["id"]
-            job = self.get_job_by_id(job_id)  # now getting job info by unique job id
-
-            job_id = job["id"]
-            status = job["status"]
-            reason = job["reason"]
-            tasks = job["tasks"]
-
-            completed_task = sum(
-                1 for task in tasks if task["status"] == config.JobStatus.Completed.name
-            )
             _log.info(
                 f"\nStatus of job for resource: {product_id}:{product_version} is [{status}]\n"
-                f"finished tasks for current job: {completed_task} / {len(tasks)}"
+                f"finished tasks for current job: {completed_task} / {total_tasks}"
             )
 
             if status == config.JobStatus.Completed.name:
-                return {
-                    "status": status,
-                    "message": " ".join(["OK", reason]),
-                    "job_id": job_id,
-                    "tasks": tasks,
-                }
+                message = " ".join(["OK", reason])
+                break
             elif status == config.JobStatus.Failed.name:
-                return {
-                    "status": status,
-                    "message": " ".join(["Failed: ", reason]),
-                    "job_id": job_id,
-                    "tasks": tasks,
-                }
+                message = " ".join(["Failed: ", reason])
+                break
 
             current_time = time.time()
+            if t_end < current_time:
+                message = " ".join(
+                    ["Failed: ", "got timeout while following job running"]
+                )
+                break
+
+            interval = poll_interval.next_interval(completed_task, total_tasks)
+            time.sleep(min(interval, max(t_end - current_time, 0)))
+
+        tasks = self.get_job_by_id(job_id)["tasks"] if return_tasks else []
+        return {
+            "status": status,
+            "message": message,
+            "job_id": job_id,
+            "tasks": tasks,
+        }
+
+    def iter_finished_jobs(
+        self,
+        products,
+        product_type="Discrete-Tiling",
+        timeout=300,
+        poll_interval=5,
+        return_tasks=False,
+        find_params=None,
+    ):
+        """
+        This generator follow many running jobs together and yield results of each job as soon as it finished
+        * every tick send single find_jobs_by_criteria query (by job type, without tasks) for all followed jobs,
+          instead of request per job
+        * query is narrowed to not cleaned jobs ({"isCleaned": "false"}), and to resourceId if all followed jobs
+          are of same product -> find_params should be used to narrow it more on job manager with long history
+        :param products: list of tuples -> [(product_id, product_version)]
+        :param product_type: type of the jobs
+        :param timeout: int -> max seconds to follow all jobs -> unfinished jobs are yielded as timeout failures
+        :param poll_interval: float -> seconds between ticks
+        :param return_tasks: bool -> get tasks list of each job when it finished (request per finished job)
+        :param find_params: dict -> additional query params for find_jobs_by_criteria, override default narrowing
+        :return: generator of dicts -> {product_id, product_version, status, message, job_id, tasks}
+        """
+        t_end = time.time() + timeout
+        pending = {(str(p_id), str(p_version)) for p_id, p_version in products}
+        params = {
+            "type": product_type,
+            "shouldReturnTasks": str(False).lower(),
+            "isCleaned": str(False).lower(),
+        }
+        product_ids = {p_id for p_id, _ in pending}
+        if len(product_ids) == 1:
+            params["resourceId"] = product_ids.pop()
+        params.update(find_params or {})
+        last_seen = {}
+
+        while pending:
+            tick_start = time.time()
+            tick_jobs = {}
+            for job in self.find_jobs_by_criteria(params):
+                key = (job["resourceId"], job["version"])
+                if key not in pending:
+                    continue
+                # on re-ingestion of same layer, follow the latest job
+                if key not in tick_jobs or job["created"] > tick_jobs[key]["created"]:
+                    tick_jobs[key] = job
+            last_seen.update(tick_jobs)
+
+            for key, job in list(last_seen.items()):
+                if key not in pending:
+                    continue
+                if job["status"] == config.JobStatus.Completed.name:
+                    message = " ".join(["OK", job["reason"]])
+                elif job["status"] == config.JobStatus.Failed.name:
+                    message = " ".join(["Failed: ", job["reason"]])
+                else:
+                    continue
+                pending.remove(key)
+                yield self._finished_job_result(key, job, message, return_tasks)
+
+            not_found = sum(1 for key in pending if key not in last_seen)
+            _log.info(
+                f"Following jobs of type [{product_type}]: [{len(pending)}] not finished, "
+                f"from them [{not_found}] not found yet"
+            )
 
+            current_time = time.time()
             if t_end < current_time:
-                return {
-                    "status": status,
-                    "message": " ".join(
+                for key in sorted(pending):
+                    message = " ".join(
                         ["Failed: ", "got timeout while following job running"]
-                    ),
-                    "job_id": job_id,
-                    "tasks": tasks,
-                }
+                    )
+                    yield self._finished_job_result(
+                        key, last_seen.get(key), message, return_tasks
+                    )
+                return
+
+            sleep_time = poll_interval - (current_time - tick_start)
+            time.sleep(min(max(sleep_time, 0), t_end - current_time))
+
+    def follow_running_jobs(
+        self,
+        products,
+        product_type="Discrete-Tiling",
+        timeout=300,
+        poll_interval=5,
+        return_tasks=False,
+        on_job_finished=None,
+        find_params=None,
+    ):
+        """
+        This method follow many running jobs together (see iter_finished_jobs) and return results of all on finish
+        :param products: list of tuples -> [(product_id, product_version)]
+        :param on_job_finished: callable -> called with result dict of each job as soon as it finished
+        :param find_params: dict -> additional query params for find_jobs_by_criteria (see iter_finished_jobs)
+        :return: list of dicts -> {product_id, product_version, status, message, job_id, tasks} by finish order
+        """
+        results = []
+        for result in self.iter_finished_jobs(
+            products,
+            product_type=product_type,
+            timeout=timeout,
+            poll_interval=poll_interval,
+            return_tasks=return_tasks,
+            find_params=find_params,
+        ):
+            _log.info(
+                f"Job of resource: {result['product_id']}:{result['product_version']} "
+                f"finished with status [{result['status']}]"
+            )
+            if on_job_finished:
+                on_job_finished(result)
+            results.append(result)
+        return results
+
+    def _finished_job_result(self, key, job, message, return_tasks):
+        tasks = []
+        if job and return_tasks:
+            tasks = self.get_job_by_id(job["id"])["tasks"]
+        return {
+            "product_id": key[0],
+            "product_version": key[1],
+            "status": job["status"] if job else None,
+            "message": message,
+            "job_id": job["id"] if job else None,
+            "tasks": tasks,
+        }
+
+    # ========================================== jobs snapshots cache ==================================================
+    def refresh_job_snapshot(self, job_id):
+        """
+        This method refresh cached snapshot of job and its tasks and return what changed since last refresh
+        * job and tasks are requested with conditional requests (If-None-Match of last ETag) -> when nothing
+          changed server return 304 without body, otherwise tasks are compared by their update time
+        :param job_id: uuid of job
+        :return: dict -> {job: dict (without tasks), job_changed: bool, changed_tasks: list[dict],
+                          not_modified: bool -> True if server return 304 for job and tasks}
+        """
+        snapshot = self.__jobs_cache.setdefault(
+            job_id,
+            {
+                "job": None,
+                "job_etag": None,
+                "job_changed_at": None,
+                "tasks": {},
+                "tasks_etag": None,
+                "task_changed_at": {},
+            },
+        )
+        now = time.time()
+
+        job_url = common.combine_url(self.__end_point_url, self.__jobs_api, job_id)
+        job_params = {"shouldReturnTasks": str(False).lower()}
+        job, job_etag = self._conditional_get(
+            "refresh_job_snapshot", job_url, job_params, snapshot["job_etag"]
+        )
+        job_changed = job is not None and job != snapshot["job"]
+        if job is not None:
+            snapshot["job_etag"] = job_etag
+            if job_changed:
+                snapshot["job"] = job
+                snapshot["job_changed_at"] = now
+
+        tasks_url = common.combine_url(
+            self.__end_point_url, self.__jobs_api, job_id, self.__tasks
+        )
+        tasks, tasks_etag = self._conditional_get(
+            "refresh_job_snapshot", tasks_url, None, snapshot["tasks_etag"]
+        )
+        changed_tasks = []
+        if tasks is not None:
+            snapshot["tasks_etag"] = tasks_etag
+            for task in tasks:
+                cached = snapshot["tasks"].get(task["id"])
+                if cached is None or _task_update_time(cached) != _task_update_time(
+                    task
+                ):
+                    changed_tasks.append(task)
+                    snapshot["task_changed_at"][task["id"]] = now
+                snapshot["tasks"][task["id"]] = task
+
+        return {
+            "job": snapshot["job"],
+            "job_changed": job_changed,
+            "changed_tasks": changed_tasks,
+            "not_modified": job is None and tasks is None,
+        }
+
+    def get_cached_job(self, job_id):
+        """
+        This method return last cached snapshot of job with its tasks (as get_job_by_id) without any request
+        :return: dict or None if job was never refreshed
+        """
+        snapshot = self.__jobs_cache.get(job_id)
+        if not snapshot or snapshot["job"] is None:
+            return None
+        job = dict(snapshot["job"])
+        job["tasks"] = list(snapshot["tasks"].values())
+        return job
+
+    def get_job_changes_since(self, job_id, since, refresh=True):
+        """
+        This method return job changes detected after provided time
+        :param job_id: uuid of job
+        :param since: float -> epoch time (time.time()) of previous check
+        :param refresh: bool -> refresh snapshot before (see refresh_job_snapshot)
+        :return: dict -> {job: dict | None (if not changed since), tasks: list[dict] changed since, time: float}
+        """
+        if refresh:
+            self.refresh_job_snapshot(job_id)
+        snapshot = self.__jobs_cache.get(job_id)
+        if not snapshot:
+            return {"job": None, "tasks": [], "time": time.time()}
+        job_changed_at = snapshot["job_changed_at"]
+        return {
+            "job": (
+                snapshot["job"] if job_changed_at and job_changed_at > since else None
+            ),
+            "tasks": [
+                snapshot["tasks"][task_id]
+                for task_id, changed_at in snapshot["task_changed_at"].items()
+                if changed_at > since
+            ],
+            "time": time.time(),
+        }
+
+    def clear_jobs_cache(self, job_id=None):
+        """
+        This method remove cached snapshot of job or all jobs snapshots if job_id not provided
+        """
+        if job_id:
+            self.__jobs_cache.pop(job_id, None)
+        else:
+            self.__jobs_cache.clear()
+
+    def _conditional_get(self, method, url, params, etag):
+        """
+        This method send get request with If-None-Match header of provided etag
+        :return: tuple -> (content, etag) -> content is None if server return 304 (not modified)
+        """
+        header = {"content-type": "application/json"}
+        if etag:
+            header["If-None-Match"] = etag
+        resp = base_requests.send_get_request(url, params, header=header)
+        if resp.status_code == config.ResponseCode.NotModified.value:
+            return None, etag
+        if resp.status_code != config.ResponseCode.Ok.value:
+            raise Exception(
+                f"[{method}]:failed retrieve data, return with error:[{resp.status_code}]:error msg:[{str(resp.content)}]"
+            )
+        return json.loads(resp.content), resp.headers.get("ETag")
+
+
+def _task_update_time(task):
+    """
+    This function return last update time of task -> job manager return it as "updated" or "updateTime"
+    """
+    return task.get("updated", task.get("updateTime"))
+
+
+class AdaptivePollInterval:
+    """
+    This class calculate the interval between polls of running job according its tasks progress:
+        - first polls are done with min_interval
+        - while no task completed since last progress -> interval multiplied by backoff_factor (up to max_interval),
+          but not beyond the expected completion time of the job
+        - on progress -> tasks throughput (tasks / sec) is measured and interval is part (eta_fraction) of the
+          estimated time to completion, so polls become faster as job approach completion
+    """
+
+    def __init__(
+        self, min_interval=0.5, max_interval=20, backoff_factor=1.5, eta_fraction=0.25
+    ):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff_factor = backoff_factor
+        self.eta_fraction = eta_fraction
+        self.interval = min_interval
+        self.throughput = None  # smoothed tasks / sec
+        self._last_completed = None
+        self._last_progress_time = None
+
+    def eta(self, completed, total, now=None):
+        """
+        This method return estimated seconds to completion of all tasks or None if throughput not measured yet
+        """
+        if not self.throughput:
+            return None
+        now = time.time() if now is None else now
+        elapsed = now - self._last_progress_time
+        return max((total - completed) / self.throughput - elapsed, 0)
+
+    def next_interval(self, completed, total, now=None):
+        """
+        This method return seconds to wait before next poll
+        :param completed: int -> number of completed tasks on current poll
+        :param total: int -> total number of tasks of the job
+        :param now: float -> time of current poll (time.time() as default)
+        """
+        now = time.time() if now is None else now
+        if self._last_completed is None:
+            self._last_completed = completed
+            self._last_progress_time = now
+            self.interval = self.min_interval
+            return self.interval
+
+        progress = completed - self._last_completed
+        elapsed = now - self._last_progress_time
+        if completed >= total:
+            interval = self.min_interval
+        elif progress > 0 and elapsed > 0:
+            rate = progress / elapsed
+            if self.throughput is None:
+                self.throughput = rate
+            else:
+                self.throughput = 0.5 * rate + 0.5 * self.throughput
+            self._last_completed = completed
+            self._last_progress_time = now
+            interval = self.eta(completed, total, now) * self.eta_fraction
+        else:
+            interval = self.interval * self.backoff_factor
+            expected = self.eta(completed, total, now)
+            if expected:
+                interval = min(interval, expected)
+
+        self.interval = min(max(interval, self.min_interval), self.max_interval)
+        return self.interval
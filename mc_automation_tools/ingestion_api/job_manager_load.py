@@ -0,0 +1,305 @@
+"""
+This module provide synthetic load generator for job manager service:
+    seeding jobs with tasks, simulated workers that dequeue (start pending), heartbeat (update) and complete tasks,
+    and reaper that find + release inactive tasks -> latency percentiles and throughput are reported per endpoint
+"""
+import json
+import logging
+import random
+import threading
+import time
+
+from mc_automation_tools import common
+from mc_automation_tools.configuration import config
+
+_log = logging.getLogger("mc_automation_tools.ingestion_api.job_manager_load")
+
+
+class LatencyRecorder:
+    """
+    This class collect latencies and errors of calls per endpoint name -> thread safe
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._latencies = {}
+        self._errors = {}
+
+    def measure(self, endpoint, func, *args):
+        """
+        This method call func with args, record its latency under endpoint name and return its result
+        * exception of the call is recorded as error of endpoint and raised
+        """
+        start = time.perf_counter()
+        try:
+            return func(*args)
+        except Exception:
+            with self._lock:
+                self._errors[endpoint] = self._errors.get(endpoint, 0) + 1
+            raise
+        finally:
+            duration = time.perf_counter() - start
+            with self._lock:
+                self._latencies.setdefault(endpoint, []).append(duration)
+
+    def report(self, elapsed):
+        """
+        This method return latency statistics per endpoint
+        :param elapsed: float -> seconds of the measured period, for throughput calculation
+        :return: dict -> {endpoint: {count, errors, throughput, mean, max, p50, p90, p95, p99}}
+        """
+        with self._lock:
+            latencies = {k: list(v) for k, v in self._latencies.items()}
+            errors = dict(self._errors)
+        report = {}
+        for endpoint, values in latencies.items():
+            report[endpoint] = {
+                "count": len(values),
+                "errors": errors.get(endpoint, 0),
+                "throughput": len(values) / elapsed if elapsed else None,
+                "mean": sum(values) / len(values),
+                "max": max(values),
+            }
+            report[endpoint].update(common.calculate_percentiles(values))
+        return report
+
+
+class JobManagerLoadGenerator:
+    """
+    This class simulate many workers of job manager tasks:
+        - seed: create jobs of job_type with tasks_per_job pending tasks of task_type
+        - workers: each worker dequeue task (start_pending), send heartbeats (update percentage) and complete it,
+          part of the tasks can be failed (fail_ratio) or abandoned without updates (abandon_ratio)
+        - reaper: periodically find inactive tasks and release them back to pending
+    * usage example:
+        generator = JobManagerLoadGenerator(JobsTasksManager(url), "LoadTest", "tiles", workers=50)
+        report = generator.run(duration=300)
+        generator.cleanup()
+    """
+
+    def __init__(
+        self,
+        job_manager,
+        job_type,
+        task_type,
+        workers=10,
+        jobs=1,
+        tasks_per_job=100,
+        heartbeats_per_task=2,
+        heartbeat_interval=1,
+        dequeue_rate=None,
+        idle_interval=1,
+        fail_ratio=0,
+        abandon_ratio=0,
+        reaper_interval=10,
+        inactive_time_sec=30,
+    ):
+        """
+        :param job_manager: JobsTasksManager instance
+        :param job_type: str -> type of seeded jobs
+        :param task_type: str -> type of seeded tasks
+        :param workers: int -> number of simulated workers (threads)
+        :param jobs: int -> number of seeded jobs
+        :param tasks_per_job: int -> number of tasks of each seeded job
+        :param heartbeats_per_task: int -> progress updates sent by worker before completing task
+        :param heartbeat_interval: float -> seconds between heartbeats (simulated work time)
+        :param dequeue_rate: float -> max start_pending requests per second of all workers, None -> unlimited
+        :param idle_interval: float -> seconds worker wait when there is no pending task
+        :param fail_ratio: float -> part of tasks that workers finish as Failed
+        :param abandon_ratio: float -> part of tasks that workers abandon without updates (reaper should release)
+        :param reaper_interval: float -> seconds between find_inactive + release_inactive calls, None -> no reaper
+        :param inactive_time_sec: int -> inactiveTimeSec param of find_inactive
+        """
+        self.job_manager = job_manager
+        self.job_type = job_type
+        self.task_type = task_type
+        self.workers = workers
+        self.jobs = jobs
+        self.tasks_per_job = tasks_per_job
+        self.heartbeats_per_task = heartbeats_per_task
+        self.heartbeat_interval = heartbeat_interval
+        self.idle_interval = idle_interval
+        self.fail_ratio = fail_ratio
+        self.abandon_ratio = abandon_ratio
+        self.reaper_interval = reaper_interval
+        self.inactive_time_sec = inactive_time_sec
+        self.recorder = LatencyRecorder()
+        self.job_ids = []
+        self._rate_limiter = common.RateLimiter(dequeue_rate)
+        self._stop = threading.Event()
+        self._counters_lock = threading.Lock()
+        self._counters = {}
+
+    def _count(self, name, value=1):
+        with self._counters_lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def seed(self):
+        """
+        This method create the jobs (with pending tasks) that workers will process
+        :return: list of created jobs ids
+        """
+        for idx in range(self.jobs):
+            body = {
+                "resourceId": f"load_test_{common.generate_uuid()[:8]}",
+                "version": "1.0",
+                "description": "job manager synthetic load test",
+                "parameters": {},
+                "status": config.JobStatus.Pending.value,
+                "type": self.job_type,
+                "percentage": 0,
+                "priority": 0,
+                "tasks": [
+                    {
+                        "description": f"load test task {task_idx}",
+                        "parameters": {},
+                        "type": self.task_type,
+                        "status": config.JobStatus.Pending.value,
+                        "percentage": 0,
+                        "attempts": 0,
+                    }
+                    for task_idx in range(self.tasks_per_job)
+                ],
+            }
+            resp = self.recorder.measure(
+                "create_new_job", self.job_manager.create_new_job, body
+            )
+            self.job_ids.append(resp["id"])
+        _log.info(
+            f"Seeded [{self.jobs}] jobs with [{self.tasks_per_job}] tasks each of type [{self.job_type}:{self.task_type}]"
+        )
+        return self.job_ids
+
+    def _worker(self):
+        while not self._stop.is_set():
+            self._rate_limiter.acquire()
+            try:
+                task = self.recorder.measure(
+                    "start_pending",
+                    self.job_manager.start_pending,
+                    self.job_type,
+                    self.task_type,
+                )
+            except Exception:
+                self._stop.wait(self.idle_interval)
+                continue
+            if not task:
+                self._count("idle_polls")
+                self._stop.wait(self.idle_interval)
+                continue
+            self._count("tasks_dequeued")
+            self._process_task(task)
+
+    def _process_task(self, task):
+        job_id, task_id = task["jobId"], task["id"]
+        if random.random() < self.abandon_ratio:
+            self._count("tasks_abandoned")
+            return
+        try:
+            for beat in range(1, self.heartbeats_per_task + 1):
+                if self._stop.wait(self.heartbeat_interval):
+                    return
+                self.recorder.measure(
+                    "update_task_by_task_id",
+                    self.job_manager.update_task_by_task_id,
+                    job_id,
+                    task_id,
+                    {
+                        "status": config.JobStatus.InProgress.value,
+                        "percentage": int(100 * beat / (self.heartbeats_per_task + 1)),
+                    },
+                )
+            failed = random.random() < self.fail_ratio
+            status = config.JobStatus.Failed if failed else config.JobStatus.Completed
+            params = {"status": status.value, "percentage": 100}
+            if failed:
+                params["reason"] = "load test synthetic failure"
+            self.recorder.measure(
+                "update_task_by_task_id",
+                self.job_manager.update_task_by_task_id,
+                job_id,
+                task_id,
+                params,
+            )
+            self._count("tasks_failed" if failed else "tasks_completed")
+        except Exception as e:
+            _log.debug(f"worker failed on task [{task_id}] with error: {str(e)}")
+            self._count("tasks_errors")
+
+    def _reaper(self):
+        params = {
+            "inactiveTimeSec": self.inactive_time_sec,
+            "types": [{"jobType": self.job_type, "taskType": self.task_type}],
+        }
+        while not self._stop.wait(self.reaper_interval):
+            try:
+                inactive = self.recorder.measure(
+                    "find_inactive", self.job_manager.find_inactive, params
+                )
+                if inactive:
+                    released = self.recorder.measure(
+                        "release_inactive", self.job_manager.release_inactive, inactive
+                    )
+                    self._count("tasks_released", len(released))
+            except Exception as e:
+                _log.debug(f"reaper failed with error: {str(e)}")
+
+    def run(self, duration=60, seed=True):
+        """
+        This method run the load for duration seconds and return report
+        :param duration: float -> seconds of load
+        :param seed: bool -> create jobs before load (see seed)
+        :return: dict -> {duration, workers, counters, endpoints: {endpoint: latency statistics}}
+        """
+        if seed:
+            self.seed()
+        self._stop.clear()
+        threads = [
+            threading.Thread(target=self._worker, name=f"jm-load-worker-{idx}")
+            for idx in range(self.workers)
+        ]
+        if self.reaper_interval:
+            threads.append(threading.Thread(target=self._reaper, name="jm-load-reaper"))
+
+        start = time.time()
+        for thread in threads:
+            thread.daemon = True
+            thread.start()
+        self._stop.wait(duration)
+        self._stop.set()
+        for thread in threads:
+            thread.join()
+        elapsed = time.time() - start
+
+        report = self.report(elapsed)
+        _log.info(f"Job manager load results:\n{json.dumps(report, indent=4)}")
+        return report
+
+    def report(self, elapsed):
+        """
+        This method return counters and latency statistics of the run
+        """
+        with self._counters_lock:
+            counters = dict(self._counters)
+        return {
+            "duration": elapsed,
+            "workers": self.workers,
+            "counters": counters,
+            "tasks_throughput": (
+                counters.get("tasks_completed", 0) / elapsed if elapsed else None
+            ),
+            "endpoints": self.recorder.report(elapsed),
+        }
+
+    def cleanup(self):
+        """
+        This method delete seeded jobs from job manager
+        """
+        for job_id in self.job_ids:
+            try:
+                self.job_manager.delete_job(job_id)
+            except Exception as e:
+                _log.error(
+                    f"Failed delete load test job [{job_id}] with error: {str(e)}"
+                )
+        self.job_ids = []
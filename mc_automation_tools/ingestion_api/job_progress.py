@@ -0,0 +1,295 @@
+"""
+This module provide tasks level progress telemetry of running job on job manager:
+    throughput, tasks duration distribution per task type, stragglers and ETA, based on time series of snapshots
+"""
+import csv
+import json
+import logging
+import time
+
+from mc_automation_tools import common
+from mc_automation_tools.configuration import config
+
+_log = logging.getLogger("mc_automation_tools.ingestion_api.job_progress")
+
+SNAPSHOT_FIELDS = [
+    "time",
+    "status",
+    "total",
+    "completed",
+    "failed",
+    "in_progress",
+    "pending",
+    "throughput",
+    "eta",
+]
+
+
+class JobProgressTracker:
+    """
+    This class collect snapshots of job (with its tasks) from JobsTasksManager and calculate progress telemetry
+    * usage example:
+        tracker = JobProgressTracker(job_manager, job_id)
+        tracker.follow(interval=5, timeout=600)
+        tracker.export_json("/tmp/job_progress.json")
+    """
+
+    def __init__(self, job_manager, job_id, straggler_factor=3, throughput_window=5):
+        """
+        :param job_manager: JobsTasksManager instance
+        :param job_id: str -> uuid of followed job
+        :param straggler_factor: running task is straggler if running longer than factor * median duration of its type
+        :param throughput_window: int -> number of last snapshots used for current throughput calculation
+        """
+        self.job_manager = job_manager
+        self.job_id = job_id
+        self.straggler_factor = straggler_factor
+        self.throughput_window = throughput_window
+        self.snapshots = []
+        self.tasks = []
+        self._task_started = (
+            {}
+        )  # task id -> server "updated" time of task first seen as In-Progress
+        self._clock_offset = None  # estimated server clock - local clock (seconds)
+
+    # ============================================== snapshots ========================================================
+    def take_snapshot(self):
+        """
+        This method request job with all its tasks and add snapshot of tasks counters to time series
+        :return: dict -> the new snapshot
+        """
+        job = self.job_manager.get_job_by_id(self.job_id)
+        now = time.time()
+        self.tasks = job["tasks"]
+        counters = {
+            config.JobStatus.Completed.value: 0,
+            config.JobStatus.Failed.value: 0,
+            config.JobStatus.InProgress.value: 0,
+            config.JobStatus.Pending.value: 0,
+        }
+        for task in self.tasks:
+            counters[task["status"]] = counters.get(task["status"], 0) + 1
+            updated = common.parse_iso_datetime(task["updated"]).timestamp()
+            # server time of response is not earlier than any update -> offset lower bound, tightest one kept
+            offset = updated - now
+            if self._clock_offset is None or offset > self._clock_offset:
+                self._clock_offset = offset
+            if task["status"] == config.JobStatus.InProgress.value:
+                self._task_started.setdefault(task["id"], updated)
+
+        snapshot = {
+            "time": now,
+            "status": job["status"],
+            "total": len(self.tasks),
+            "completed": counters[config.JobStatus.Completed.value],
+            "failed": counters[config.JobStatus.Failed.value],
+            "in_progress": counters[config.JobStatus.InProgress.value],
+            "pending": counters[config.JobStatus.Pending.value],
+        }
+        self.snapshots.append(snapshot)
+        snapshot["throughput"] = self.throughput()
+        snapshot["eta"] = self.eta()
+        _log.info(
+            f"Job [{self.job_id}] status: [{snapshot['status']}], "
+            f"completed tasks: {snapshot['completed']} / {snapshot['total']}, "
+            f"throughput: [{snapshot['throughput']}] tasks/sec, eta: [{snapshot['eta']}] sec"
+        )
+        return snapshot
+
+    def follow(self, interval=5, timeout=300):
+        """
+        This method take snapshots every interval seconds until job finished or timeout
+        :return: dict -> summary of the progress
+        """
+        t_end = time.time() + timeout
+        while True:
+            snapshot = self.take_snapshot()
+            if snapshot["status"] in (
+                config.JobStatus.Completed.name,
+                config.JobStatus.Failed.name,
+            ):
+                break
+            if time.time() + interval > t_end:
+                _log.warning(f"Got timeout while following job [{self.job_id}]")
+                break
+            time.sleep(interval)
+        return self.summary()
+
+    # ============================================== telemetry ========================================================
+    def throughput(self, window=None):
+        """
+        This method return completed tasks per second over last window snapshots (throughput_window as default)
+        :return: float or None if less than 2 snapshots
+        """
+        window = window or self.throughput_window
+        samples = self.snapshots[-(window + 1) :]
+        if len(samples) < 2:
+            return None
+        elapsed = samples[-1]["time"] - samples[0]["time"]
+        if elapsed <= 0:
+            return None
+        return (samples[-1]["completed"] - samples[0]["completed"]) / elapsed
+
+    def average_throughput(self):
+        """
+        This method return completed tasks per second from first snapshot to last one
+        """
+        return self.throughput(window=len(self.snapshots))
+
+    def eta(self):
+        """
+        This method return estimated seconds to completion of all tasks by current throughput
+        :return: float or None if throughput not measured yet \\ zero
+        """
+        if not self.snapshots:
+            return None
+        last = self.snapshots[-1]
+        remaining = last["total"] - last["completed"] - last["failed"]
+        if remaining <= 0:
+            return 0
+        throughput = self.throughput()
+        if not throughput:
+            return None
+        return remaining / throughput
+
+    def task_durations(self):
+        """
+        This method return durations (seconds) of completed tasks grouped by task type
+        * start and end are server timestamps -> start is "updated" of task on first snapshot seen In-Progress,
+          end is "updated" of completed task (job manager tasks have no start timestamp)
+        * durations are biased short -> "updated" of first snapshot may be a progress update after the real start.
+          tasks started and completed between two snapshots are excluded (see excluded_tasks_count)
+        :return: dict -> {task_type: [durations]}
+        """
+        durations = {}
+        for task in self.tasks:
+            if task["status"] != config.JobStatus.Completed.value:
+                continue
+            if task["id"] not in self._task_started:
+                continue
+            end = common.parse_iso_datetime(task["updated"]).timestamp()
+            durations.setdefault(task["type"], []).append(
+                end - self._task_started[task["id"]]
+            )
+        return durations
+
+    def excluded_tasks_count(self):
+        """
+        This method return number of completed tasks excluded from durations -> never seen In-Progress
+        """
+        return sum(
+            1
+            for task in self.tasks
+            if task["status"] == config.JobStatus.Completed.value
+            and task["id"] not in self._task_started
+        )
+
+    def server_time(self, now=None):
+        """
+        This method return estimated server epoch time of local time (now as default) -> None before first snapshot
+        * clock offset estimated from tasks "updated" timestamps vs local time of the snapshots
+        """
+        if self._clock_offset is None:
+            return None
+        return (time.time() if now is None else now) + self._clock_offset
+
+    def duration_distribution(self, percentiles=(50, 90, 95, 99)):
+        """
+        This method return distribution of completed tasks duration per task type
+        :return: dict -> {task_type: {count, min, mean, max, p50, p90...}}
+        """
+        distribution = {}
+        for task_type, durations in self.task_durations().items():
+            distribution[task_type] = {
+                "count": len(durations),
+                "min": min(durations),
+                "mean": sum(durations) / len(durations),
+                "max": max(durations),
+            }
+            distribution[task_type].update(
+                common.calculate_percentiles(durations, percentiles)
+            )
+        return distribution
+
+    def stragglers(self, now=None):
+        """
+        This method return running tasks that running longer than straggler_factor * median duration of their type
+        * task types with less than 3 completed tasks are not evaluated
+        :param now: float -> server epoch time (same clock as start times), estimated by server_time as default
+        :return: list of dicts -> {id, type, running_sec, median_sec}
+        """
+        now = self.server_time() if now is None else now
+        medians = {
+            task_type: dist["p50"]
+            for task_type, dist in self.duration_distribution(percentiles=(50,)).items()
+            if dist["count"] >= 3
+        }
+        results = []
+        for task in self.tasks:
+            if task["status"] != config.JobStatus.InProgress.value:
+                continue
+            median = medians.get(task["type"])
+            if not median or now is None or task["id"] not in self._task_started:
+                continue
+            running = now - self._task_started[task["id"]]
+            if running > self.straggler_factor * median:
+                results.append(
+                    {
+                        "id": task["id"],
+                        "type": task["type"],
+                        "running_sec": running,
+                        "median_sec": median,
+                    }
+                )
+        return results
+
+    def summary(self):
+        """
+        This method return summary of job progress telemetry
+        """
+        last = self.snapshots[-1] if self.snapshots else {}
+        return {
+            "job_id": self.job_id,
+            "status": last.get("status"),
+            "total": last.get("total"),
+            "completed": last.get("completed"),
+            "failed": last.get("failed"),
+            "duration_sec": (
+                self.snapshots[-1]["time"] - self.snapshots[0]["time"]
+                if self.snapshots
+                else None
+            ),
+            "throughput": self.throughput(),
+            "average_throughput": self.average_throughput(),
+            "eta": self.eta(),
+            "tasks_duration": self.duration_distribution(),
+            "tasks_duration_excluded": self.excluded_tasks_count(),
+            "stragglers": self.stragglers(),
+        }
+
+    # =============================================== exports =========================================================
+    def export_csv(self, path):
+        """
+        This method write snapshots time series as csv file
+        :param path: str -> output file path
+        """
+        with open(path, mode="w", newline="") as csv_file:
+            writer = csv.DictWriter(csv_file, fieldnames=SNAPSHOT_FIELDS)
+            writer.writeheader()
+            for snapshot in self.snapshots:
+                writer.writerow(snapshot)
+        return path
+
+    def export_json(self, path):
+        """
+        This method write summary + snapshots time series as json file
+        :param path: str -> output file path
+        """
+        with open(path, "w") as fp:
+            json.dump(
+                {"summary": self.summary(), "snapshots": self.snapshots},
+                fp,
+                indent=4,
+                default=str,
+            )
+        return path
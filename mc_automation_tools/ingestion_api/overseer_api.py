@@ -102,11 +102,28 @@ This module is the wrapper for overseer api according provided swagger
       ]
     }
 """
+import copy
 import json
+import logging
+import threading
+import time
 
+import requests
 from mc_automation_tools import base_requests, common
 from mc_automation_tools.configuration import config
 
+_log = logging.getLogger("mc_automation_tools.ingestion_api.overseer_api")
+
+# create layer is not idempotent -> retried by default only on responses the request was not processed
+TRANSIENT_RESPONSE_CODES = (
+    config.ResponseCode.BadGateway.value,
+    config.ResponseCode.ServiceUnavailable.value,
+)
+SERVER_ERROR_RESPONSE_CODES = (
+    config.ResponseCode.ServerError.value,
+    config.ResponseCode.GetwayTimeOut.value,
+)
+
 
 class Overseer:
     __layers = "layers"
@@ -114,8 +131,15 @@ class Overseer:
     __completed = "completed"
     __toc = "toc"
 
-    def __init__(self, end_point_url):
+    def __init__(self, end_point_url, toc_cache_ttl=None):
+        """
+        :param end_point_url: url of overseer service
+        :param toc_cache_ttl: float -> seconds to cache toc responses per layer (see toc), None -> no cache
+        """
         self.__end_point_url = end_point_url
+        self.toc_cache_ttl = toc_cache_ttl
+        self._toc_cache = {}
+        self._toc_cache_lock = threading.Lock()
 
     @property
     def get_class_params(self):
@@ -153,6 +177,106 @@ class Overseer:
 
         return resp.status_code, resp.request.body
 
+    def create_layers(
+        self,
+        layers_requests,
+        max_workers=8,
+        rate=None,
+        retries=3,
+        retry_backoff=1,
+        retry_server_errors=False,
+        timeout=60,
+    ):
+        """
+        This method submit many create layer requests concurrently, with rate limit and retries of transient failures
+        * transient failure -> connection error or response of 502, 503, retried with exponential backoff
+        * 500, 504 (and read timeout) may come after layer creation already started on overseer -> retried only if
+          retry_server_errors, retry may create duplicated layer
+        * usage example:
+            results = overseer.create_layers([shape_convertor.generate_oversear_request(...), ...], rate=2)
+        :param layers_requests: list of create layer request bodies -> *** Example provided on module description
+        :param max_workers: int -> max concurrent submits
+        :param rate: float -> max submits (including retries) per second, None -> unlimited
+        :param retries: int -> max retries of transient failure per request
+        :param retry_backoff: float -> seconds to wait before first retry, doubled on each retry
+        :param retry_server_errors: bool -> retry also on 500, 504 responses and on read timeout
+        :param timeout: float -> seconds to wait for connection and for response of each submit
+        :return: list of dicts ordered as layers_requests ->
+            {index, product_id, success, status_code, attempts, latency, duration, error}
+            latency - seconds of last submit, duration - seconds including retries and rate limit waits
+        """
+        url = common.combine_url(self.__end_point_url, self.__layers)
+        common.url_validator(url)
+        header = {"content-type": "application/json", "accept": "*/*"}
+        session = base_requests.create_session(pool_size=max_workers)
+        rate_limiter = common.RateLimiter(rate)
+        retry_codes = TRANSIENT_RESPONSE_CODES + (
+            SERVER_ERROR_RESPONSE_CODES if retry_server_errors else ()
+        )
+        retry_errors = (
+            (requests.exceptions.ConnectionError, requests.exceptions.Timeout)
+            if retry_server_errors
+            else requests.exceptions.ConnectionError
+        )
+
+        def _submit(index, body):
+            result = {
+                "index": index,
+                "product_id": body.get("metadata", {}).get("productId"),
+                "success": False,
+                "status_code": None,
+                "attempts": 0,
+                "latency": None,
+                "error": None,
+            }
+            start = time.time()
+            for attempt in range(retries + 1):
+                if attempt:
+                    time.sleep(retry_backoff * 2 ** (attempt - 1))
+                rate_limiter.acquire()
+                result["attempts"] += 1
+                submit_start = time.time()
+                try:
+                    resp = session.post(
+                        url, data=json.dumps(body), headers=header, timeout=timeout
+                    )
+                except requests.exceptions.RequestException as e:
+                    result["latency"] = time.time() - submit_start
+                    result["status_code"] = None
+                    result["error"] = str(e)
+                    if isinstance(e, retry_errors):
+                        continue
+                    break
+                result["latency"] = time.time() - submit_start
+                result["status_code"] = resp.status_code
+                if resp.status_code == config.ResponseCode.Ok.value:
+                    result["success"] = True
+                    result["error"] = None
+                    break
+                result["error"] = str(resp.content)
+                if resp.status_code not in retry_codes:
+                    break
+            result["duration"] = time.time() - start
+            if not result["success"]:
+                _log.error(
+                    f"[create_layers]:failed on send create layer [{result['product_id']}] to overseer after "
+                    f"[{result['attempts']}] attempts, return with error:[{result['status_code']}], "
+                    f"error msg:[{result['error']}]"
+                )
+            return result
+
+        try:
+            results = common.run_concurrently(
+                _submit, list(enumerate(layers_requests)), max_workers=max_workers
+            )
+        finally:
+            session.close()
+        results = [res["result"] for res in results]
+        _log.info(
+            f"[create_layers]: submitted [{sum(res['success'] for res in results)} / {len(results)}] layers"
+        )
+        return results
+
     # ===============================================tasks api's========================================================
 
     def update_completion(self, job_id, task_id):
@@ -175,9 +299,12 @@ class Overseer:
 
     # =================================================toc api's========================================================
 
-    def toc(self, params):
+    def toc(self, params, use_cache=True):
         """
         This method get a toc file representing the given layer.
+        * if overseer created with toc_cache_ttl -> parsed response is cached by
+          (productId, productVersion, productType, operation) and returned without request until ttl expired
+          (deep copied on store and return -> callers can't modify cached toc)
         ** body sample:
             {
               "productId": "string",
@@ -285,6 +412,13 @@ class Overseer:
               }
             }
         """
+        key = _toc_key(params)
+        if use_cache and self.toc_cache_ttl:
+            with self._toc_cache_lock:
+                cached = self._toc_cache.get(key)
+            if cached and time.time() - cached[0] <= self.toc_cache_ttl:
+                return copy.deepcopy(cached[1])
+
         url = common.combine_url(self.__end_point_url, self.__toc)
         resp = base_requests.send_post_request(url, params)
         if resp.status_code != config.ResponseCode.Ok.value:
@@ -294,4 +428,109 @@ class Overseer:
                 f"error msg:[{str(resp.content)}]"
             )
 
-        return json.loads(resp.content)
+        content = json.loads(resp.content)
+        if self.toc_cache_ttl:
+            with self._toc_cache_lock:
+                self._toc_cache[key] = (time.time(), copy.deepcopy(content))
+        return content
+
+    def clear_toc_cache(self, params=None):
+        """
+        This method remove cached toc of single layer (by its toc params) or all cached tocs
+        """
+        with self._toc_cache_lock:
+            if params is None:
+                self._toc_cache.clear()
+            else:
+                self._toc_cache.pop(_toc_key(params), None)
+
+    def get_tocs(self, params_list, max_workers=8, use_cache=True):
+        """
+        This method get tocs of many layers concurrently -> same layer requested once per call (each entry own copy)
+        :param params_list: list of toc request bodies (see toc)
+        :param max_workers: int -> max concurrent requests
+        :param use_cache: bool -> use toc cache (if enabled)
+        :return: list ordered as params_list -> toc dict, or None for layer failed on request
+        """
+        unique = {}
+        for params in params_list:
+            unique.setdefault(_toc_key(params), params)
+        keys = list(unique)
+        results = common.run_concurrently(
+            lambda params: self.toc(params, use_cache),
+            [(unique[key],) for key in keys],
+            max_workers=max_workers,
+        )
+        tocs = {key: res["result"] for key, res in zip(keys, results)}
+        return [copy.deepcopy(tocs[_toc_key(params)]) for params in params_list]
+
+    def diff_tocs_with_pycsw(
+        self, params_list, pycsw_records, max_workers=8, use_cache=True
+    ):
+        """
+        This method get tocs of many layers and compare their metadata with pycsw records
+        :param params_list: list of toc request bodies (see toc)
+        :param pycsw_records: list of pycsw records (PycswHandler.get_raster_records) -> requested once by caller
+        :return: dict -> {(productId, productVersion, productType): diff (see diff_toc_metadata)},
+            diff is None if toc request failed, "missing" if no pycsw record found
+        """
+        records = {
+            (
+                record.get("mc:productId"),
+                record.get("mc:productVersion"),
+                record.get("mc:productType"),
+            ): record
+            for record in pycsw_records
+        }
+        tocs = self.get_tocs(params_list, max_workers, use_cache)
+        results = {}
+        for params, toc in zip(params_list, tocs):
+            key = _toc_key(params)[:3]
+            if toc is None:
+                results[key] = None
+            elif key not in records:
+                results[key] = "missing"
+            else:
+                results[key] = diff_toc_metadata(toc, records[key])
+        return results
+
+
+def _toc_key(params):
+    """
+    This function return cache key of toc request -> (productId, productVersion, productType, operation)
+    """
+    return (
+        params.get("productId"),
+        params.get("productVersion"),
+        params.get("productType"),
+        params.get("operation"),
+    )
+
+
+def diff_toc_metadata(toc, pycsw_record):
+    """
+    This function return compact diff between toc metadata and pycsw record ("mc:" prefixed keys)
+    * only scalar toc fields are compared, numbers compared as floats and other values as strings,
+      fields missing on pycsw record are ignored
+    :param toc: dict -> toc response (see Overseer.toc)
+    :param pycsw_record: dict -> single pycsw record
+    :return: dict -> {field: {"toc": value, "pycsw": value}} of different fields, empty if equal
+    """
+    diff = {}
+    for field, toc_value in toc.get("metadata", {}).items():
+        pycsw_key = f"mc:{field}"
+        if isinstance(toc_value, (dict, list)) or pycsw_key not in pycsw_record:
+            continue
+        pycsw_value = pycsw_record[pycsw_key]
+        if not _equal_values(toc_value, pycsw_value):
+            diff[field] = {"toc": toc_value, "pycsw": pycsw_value}
+    return diff
+
+
+def _equal_values(first, second):
+    if first is None or second is None:
+        return first == second
+    try:
+        return float(first) == float(second)
+    except (TypeError, ValueError):
+        return str(first) == str(second)
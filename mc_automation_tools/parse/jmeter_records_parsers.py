@@ -2,58 +2,81 @@
  - This module parsing and generating recording output and provide useful data options
  - compatible with jmeter version 5.3 output records files
  - compatible for mapproxy
+ - records are read as stream (generators) -> multi-GB records files are parsed with constant memory
 """
 import csv
-import datetime
 import logging
 import os
 
-from mc_automation_tools import common, init_logger
+from mc_automation_tools import common
 
 logger = logging.getLogger("jmeter_records_parsers")
 
-url = "/home/ronenk1/dev/apache-jmeter-5.3/tests/summary_wmts_openshift.csv"  # todo - delete after debug
-url_wms = (
-    "/home/ronenk1/dev/apache-jmeter-5.3/tests/wms-res.jtl"  # todo - delete after debug
+JTL_URL_COLUMN = "URL"  # name of request url column on jmeter csv (jtl) results header
+JTL_URL_INDEX = 13  # index of url column on jmeter 5.3 default results columns, used if header not include url
+WMTS_JTL_URL_PREFIX = (
+    "http://map-raster.apps.v0h0bdx6.eastus.aroapp.io/wmts/full_il/newGrids/"
 )
-url_wmts_jtl = "/home/ronenk1/dev/apache-jmeter-5.3/tests/map_proxy_tests_jmeter/stress/wmts/27-04-21-07:02:27/wmts-res.jtl"
 
 
-def generate_tiles_csv(orig_file_url, mode="jmeter_csv"):
+def iter_records(orig_file_url, delimiter=","):
     """
-    This method get original csv records output file and return parced tiles params file/
+    This generator read records file (jtl or jmeter csv with header line) and yield row by row as dict
     :param orig_file_url: directory to csv file
-    :return: csv with z,x,y tiles list
+    :param delimiter: str -> columns delimiter
+    :return: generator of dicts -> {column name: value}
     """
+    if not os.path.exists(orig_file_url):
+        raise FileNotFoundError(
+            "File not exists! try another directory path to provide"
+        )
+    with open(orig_file_url, newline="") as csv_file:
+        yield from csv.DictReader(csv_file, delimiter=delimiter)
+
 
-    urls_list = []
+def iter_urls(orig_file_url, mode="jmeter_csv"):
+    """
+    This generator read records file and yield the requested url of each record
+    :param orig_file_url: directory to csv file
+    :param mode: str -> "jmeter_csv" - url is first column, "jtl" - url column found by header name
+    :return: generator of url strings
+    """
+    if mode not in ("jmeter_csv", "jtl"):
+        raise Exception("Unknown parsing mode, choose jtl or jmeter_csv")
     if not os.path.exists(orig_file_url):
         raise FileNotFoundError(
             "File not exists! try another directory path to provide"
         )
     logger.info("Read and parse file %s", str(os.path.basename(orig_file_url)))
 
-    with open(orig_file_url) as csv_file:
+    line_count = 0
+    with open(orig_file_url, newline="") as csv_file:
         csv_reader = csv.reader(csv_file, delimiter=",")
-        line_count = 0
+        header = next(csv_reader, None)
+        if header is None:
+            return
+        logger.debug(f'Column names are {", ".join(header)}')
+        if mode == "jmeter_csv":
+            index = 0
+        elif JTL_URL_COLUMN in header:
+            index = header.index(JTL_URL_COLUMN)
+        else:
+            index = JTL_URL_INDEX
         for row in csv_reader:
-            if line_count == 0:
-                logger.info(f'Column names are {", ".join(row)}')
-                line_count += 1
-            else:
-                if mode == "jmeter_csv":
-                    urls_list.append(row[0])
-                    logger.info("reads line of : %s", row[0])
-                    line_count += 1
-                elif mode == "jtl":
-                    urls_list.append(row[13])
-                    logger.info("reads line of : %s", row[13])
-                    line_count += 1
-                else:
-                    raise Exception("Unknown parsing mode, choose jtl or jmeter_csv")
-        logger.info(f"Processed {line_count} lines.")
-
-    return urls_list
+            line_count += 1
+            if len(row) > index:
+                yield row[index]
+    logger.info(f"Processed {line_count} lines.")
+
+
+def generate_tiles_csv(orig_file_url, mode="jmeter_csv"):
+    """
+    This method get original csv records output file and return parced tiles params file/
+    * for big files use iter_urls -> this method hold all urls on memory
+    :param orig_file_url: directory to csv file
+    :return: csv with z,x,y tiles list
+    """
+    return list(iter_urls(orig_file_url, mode))
 
 
 def generate_wmts_csv(url_list):
@@ -76,7 +99,7 @@ def generate_wmts_csv(url_list):
                 }
                 dict_list.append(res_dict)
             except Exception as e:
-                print(str(e))
+                logger.debug(f"Failed parse wmts url [{url}] with error: {str(e)}")
                 continue
 
     return dict_list
@@ -95,7 +118,10 @@ def generate_wms_csv(url_list):
 
 
 def write_dict_to_csv(dict_list, output_dir="/tmp", protocol="wms"):
-    # file_url = common.combine_url(output_dir, datetime.datetime.now().strftime("%H_%M_%S"),'wmts_csv.csv')
+    """
+    This method write tiles \\ wms requests params into csv file -> dict_list can be generator (written as stream)
+    :return: str -> path of written file
+    """
     file_url = common.combine_url(output_dir, ".".join([protocol, "csv"]))
     if protocol == "wmts":
         with open(file_url, mode="w") as wmts_file:
@@ -131,32 +157,35 @@ def write_dict_to_csv(dict_list, output_dir="/tmp", protocol="wms"):
                 wmts_writer.writerow(request_list)
     else:
         raise Exception("Unknown parsing mode, choose wms or wmts")
+    return file_url
 
 
-list_url = generate_tiles_csv(url_wmts_jtl, "jtl")
-
-
-def generate_wmts_jtl(list_url):
-    dict_list = []
+def iter_wmts_jtl(list_url, url_prefix=WMTS_JTL_URL_PREFIX):
+    """
+    This generator yield tile params {tile_matrix, tile_cols, tile_rows} of wmts urls start with url_prefix
+    """
     for url in list_url:
-        if (
-            "http://map-raster.apps.v0h0bdx6.eastus.aroapp.io/wmts/full_il/newGrids/"
-            in url
-        ):
+        if url_prefix in url:
             tmp = url.split(".")[-2]
             tmp = tmp.split("/")[-3:]
-            res_dict = {
+            yield {
                 "tile_matrix": int(tmp[0]),
                 "tile_cols": int(tmp[1]),
                 "tile_rows": int(tmp[2]),
             }
-            dict_list.append(res_dict)
 
-    return dict_list
 
+def generate_wmts_jtl(list_url, url_prefix=WMTS_JTL_URL_PREFIX):
+    return list(iter_wmts_jtl(list_url, url_prefix))
 
-result = generate_wmts_jtl(list_url)
-# result = generate_wms_csv(list_url)
-# result = generate_wmts_csv(list_url)
-# result = write_dict_to_csv(result, "/tmp", "wmts")
-write_dict_to_csv(result, "/tmp", "wmts")
+
+def jtl_to_wmts_csv(jtl_file_url, output_dir="/tmp", url_prefix=WMTS_JTL_URL_PREFIX):
+    """
+    This method convert jtl results file into wmts tiles csv (z,x,y per line) as stream -> constant memory
+    * usage example:
+        jtl_to_wmts_csv("/path/to/wmts-res.jtl", "/tmp")
+    :return: str -> path of written csv file
+    """
+    return write_dict_to_csv(
+        iter_wmts_jtl(iter_urls(jtl_file_url, "jtl"), url_prefix), output_dir, "wmts"
+    )
@@ -0,0 +1,215 @@
+"""
+This module provide vectorized statistics engine for jmeter 5.3 results (jtl \\ csv with header line):
+    records are loaded into columnar DataFrame with explicit compact dtypes (optionally by chunks) and analyzed
+    with pandas \\ numpy operations -> throughput over time, latency percentiles, error rates and per label breakdown
+"""
+import json
+import logging
+
+import numpy as np
+import pandas as pd
+
+_log = logging.getLogger("mc_automation_tools.parse.jtl_statistics")
+
+JTL_DTYPES = {
+    "timeStamp": "int64",
+    "elapsed": "int32",
+    "label": "category",
+    "responseCode": "category",
+    "success": "category",
+    "bytes": "int64",
+    "sentBytes": "int64",
+    "allThreads": "int32",
+    "Latency": "int32",
+    "Connect": "int32",
+}
+PERCENTILES = (50, 90, 95, 99)
+
+
+def load_jtl(file_path, columns=None, chunksize=None):
+    """
+    This function load jtl results file into DataFrame -> only columns of JTL_DTYPES (or provided columns)
+    * "timeStamp" converted to datetime, "success" converted to bool
+    :param file_path: str -> path of jtl \\ csv results file
+    :param columns: list of columns names to load, None -> all columns of JTL_DTYPES exist on file
+    :param chunksize: int -> rows per chunk, reading by chunks reduce peak memory of parsing huge files
+    :return: pandas.DataFrame
+    """
+    header = pd.read_csv(file_path, nrows=0).columns
+    columns = [col for col in (columns or JTL_DTYPES) if col in header]
+    dtypes = {col: JTL_DTYPES[col] for col in columns if col in JTL_DTYPES}
+    if chunksize:
+        chunks = pd.read_csv(
+            file_path, usecols=columns, dtype=dtypes, chunksize=chunksize
+        )
+        df = pd.concat((_normalize(chunk) for chunk in chunks), ignore_index=True)
+        for col, dtype in dtypes.items():
+            if dtype == "category" and col != "success":
+                df[col] = df[col].astype("category")
+    else:
+        df = _normalize(pd.read_csv(file_path, usecols=columns, dtype=dtypes))
+    _log.info(f"Loaded [{len(df)}] samples from [{file_path}]")
+    return df
+
+
+def _normalize(df):
+    if "success" in df:
+        df["success"] = df["success"].astype(str).str.lower().eq("true")
+    if "timeStamp" in df:
+        df["timeStamp"] = pd.to_datetime(df["timeStamp"], unit="ms")
+    return df
+
+
+def _latency_stats(elapsed, percentiles=PERCENTILES):
+    """
+    This function return latency statistics of elapsed values (ms) -> {mean, min, max, p50, p90...}
+    """
+    values = np.asarray(elapsed, dtype=np.float64)
+    if not len(values):
+        return {"mean": None, "min": None, "max": None}
+    stats = {
+        "mean": float(values.mean()),
+        "min": float(values.min()),
+        "max": float(values.max()),
+    }
+    for percentile, value in zip(percentiles, np.percentile(values, percentiles)):
+        stats[f"p{percentile:g}"] = float(value)
+    return stats
+
+
+class JtlStatistics:
+    """
+    This class calculate statistics of jmeter results DataFrame (see load_jtl)
+    * usage example:
+        stats = JtlStatistics.from_files(["injector_1.jtl", "injector_2.jtl"], chunksize=1000000)
+        stats.summary(), stats.per_label(), stats.throughput_over_time("10s")
+    """
+
+    def __init__(self, df, percentiles=PERCENTILES):
+        """
+        :param df: pandas.DataFrame -> jmeter results (see load_jtl)
+        :param percentiles: percentiles of latency to calculate -> numbers between 0 - 100
+        """
+        self.df = df
+        self.percentiles = percentiles
+
+    @classmethod
+    def from_files(cls, file_paths, chunksize=None, percentiles=PERCENTILES):
+        """
+        This method load and combine results of several files (e.g. several injectors of same run)
+        """
+        if isinstance(file_paths, str):
+            file_paths = [file_paths]
+        frames = [load_jtl(path, chunksize=chunksize) for path in file_paths]
+        df = frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True)
+        for col in ("label", "responseCode"):
+            if col in df and df[col].dtype != "category":
+                df[col] = df[col].astype("category")
+        return cls(df, percentiles)
+
+    def _duration(self, df):
+        if df.empty:
+            return 0
+        start = df["timeStamp"].min()
+        end = (df["timeStamp"] + pd.to_timedelta(df["elapsed"], unit="ms")).max()
+        return (end - start).total_seconds()
+
+    def summary(self):
+        """
+        This method return statistics of all samples
+        :return: dict -> {count, errors, error_rate, duration, throughput, mean, min, max, p50, p90...}
+            latencies in ms, duration in sec, throughput in samples per sec
+        """
+        return self._stats(self.df)
+
+    def _stats(self, df):
+        count = len(df)
+        errors = int((~df["success"]).sum()) if "success" in df else 0
+        duration = self._duration(df)
+        stats = {
+            "count": count,
+            "errors": errors,
+            "error_rate": errors / count if count else None,
+            "duration": duration,
+            "throughput": count / duration if duration else None,
+        }
+        stats.update(_latency_stats(df["elapsed"], self.percentiles))
+        return stats
+
+    def per_label(self):
+        """
+        This method return statistics per sample label -> grouped and aggregated vectorized
+        :return: dict -> {label: {count, errors, error_rate, mean, min, max, p50, p90...}}
+        """
+        df = self.df
+        grouped = df.groupby("label", observed=True)
+        table = grouped["elapsed"].agg(["count", "mean", "min", "max"])
+        for percentile in self.percentiles:
+            table[f"p{percentile:g}"] = grouped["elapsed"].quantile(percentile / 100)
+        if "success" in df:
+            table["errors"] = (~df["success"]).groupby(df["label"], observed=True).sum()
+        else:
+            table["errors"] = 0
+        table["error_rate"] = table["errors"] / table["count"]
+        table = table.astype({"count": "int64", "errors": "int64"})
+        return {
+            str(label): {
+                key: (value.item() if hasattr(value, "item") else value)
+                for key, value in row.items()
+            }
+            for label, row in table.to_dict(orient="index").items()
+        }
+
+    def throughput_over_time(self, interval="1s"):
+        """
+        This method return samples, errors and latency per time bucket
+        :param interval: str -> pandas offset alias of bucket size ("1s", "10s", "1min")
+        :return: pandas.DataFrame indexed by bucket start -> columns: count, errors, throughput, mean, p90...
+        """
+        series = self.df.set_index("timeStamp")
+        resampled = series["elapsed"].resample(interval)
+        table = pd.DataFrame({"count": resampled.count(), "mean": resampled.mean()})
+        for percentile in self.percentiles:
+            table[f"p{percentile:g}"] = resampled.quantile(percentile / 100)
+        if "success" in series:
+            table["errors"] = (~series["success"]).resample(interval).sum()
+        table["throughput"] = table["count"] / pd.Timedelta(interval).total_seconds()
+        return table
+
+    def error_breakdown(self):
+        """
+        This method return number of failed samples per label and response code
+        :return: dict -> {label: {response code: count}}
+        """
+        if "success" not in self.df:
+            return {}
+        failed = self.df[~self.df["success"]]
+        counts = failed.groupby(["label", "responseCode"], observed=True).size()
+        breakdown = {}
+        for (label, code), count in counts.items():
+            breakdown.setdefault(str(label), {})[str(code)] = int(count)
+        return breakdown
+
+    def report(self, interval=None):
+        """
+        This method return full report -> {summary, labels, errors} and "timeline" if interval provided
+        """
+        report = {
+            "summary": self.summary(),
+            "labels": self.per_label(),
+            "errors": self.error_breakdown(),
+        }
+        if interval:
+            timeline = self.throughput_over_time(interval)
+            timeline.index = timeline.index.astype(str)
+            report["timeline"] = json.loads(timeline.to_json(orient="index"))
+        return report
+
+    def export_json(self, path, interval=None):
+        """
+        This method write report as json file
+        :param path: str -> output file path
+        """
+        with open(path, "w") as fp:
+            json.dump(self.report(interval), fp, indent=4, default=str)
+        return path
@@ -0,0 +1,300 @@
+"""
+This module provide HDR style latency histogram -> log-linear buckets with bounded relative error,
+mergeable between files \\ runs \\ injector nodes (merged percentiles are correct, unlike averaging percentiles)
+and compact serialization (sparse buckets, zlib compressed)
+    * value v < sub_bucket_count is counted exactly, bigger values share bucket with values of same
+      highest sub_bucket_bits bits -> relative error bounded by 1 / 10 ** significant_figures
+"""
+import base64
+import json
+import logging
+import math
+import zlib
+from concurrent import futures
+
+from mc_automation_tools.parse import jmeter_records_parsers
+
+_log = logging.getLogger("mc_automation_tools.parse.latency_histogram")
+
+# max allowed relative increase of metric vs baseline on compare
+DEFAULT_THRESHOLDS = {"p50": 0.1, "p90": 0.1, "p99": 0.2}
+
+
+class LatencyHistogram:
+    """
+    This class count latencies on log-linear buckets
+    * usage example:
+        histogram = LatencyHistogram.merge_all([build_from_jtl(path) for path in injectors_files])
+        histogram.percentiles(), LatencyHistogram.compare(baseline, histogram)
+    """
+
+    def __init__(self, significant_figures=2, resolution=1):
+        """
+        :param significant_figures: int -> 1 - 5, precision of recorded values
+        :param resolution: float -> size of recorded unit, values recorded as round(value / resolution)
+            e.g. 1 for jmeter elapsed ms, 0.001 for seconds values with ms resolution
+        """
+        if not 1 <= significant_figures <= 5:
+            raise ValueError("significant_figures should be between 1 - 5")
+        self.significant_figures = significant_figures
+        self.resolution = resolution
+        self.sub_bucket_bits = math.ceil(math.log2(2 * 10**significant_figures))
+        self.sub_bucket_count = 1 << self.sub_bucket_bits
+        self.sub_bucket_half = self.sub_bucket_count // 2
+        self.counts = {}
+        self.total_count = 0
+        self.total = 0
+        self.min = None
+        self.max = None
+
+    # ============================================== recording ========================================================
+    def _index(self, units):
+        if units < self.sub_bucket_count:
+            return units
+        shift = units.bit_length() - self.sub_bucket_bits
+        return (
+            self.sub_bucket_count
+            + (shift - 1) * self.sub_bucket_half
+            + ((units >> shift) - self.sub_bucket_half)
+        )
+
+    def _bucket_range(self, index):
+        """
+        This method return (lowest, highest) units of values counted on bucket index
+        """
+        if index < self.sub_bucket_count:
+            return index, index
+        shift, sub = divmod(index - self.sub_bucket_count, self.sub_bucket_half)
+        shift += 1
+        sub += self.sub_bucket_half
+        return sub << shift, ((sub + 1) << shift) - 1
+
+    def record(self, value, count=1):
+        """
+        This method count value (count times)
+        """
+        if value < 0:
+            raise ValueError(f"Latency value should not be negative: [{value}]")
+        units = int(round(value / self.resolution))
+        index = self._index(units)
+        self.counts[index] = self.counts.get(index, 0) + count
+        self.total_count += count
+        self.total += units * count
+        self.min = units if self.min is None else min(self.min, units)
+        self.max = units if self.max is None else max(self.max, units)
+
+    def record_many(self, values):
+        """
+        This method count all values of iterable
+        """
+        for value in values:
+            self.record(value)
+        return self
+
+    # ============================================== statistics =======================================================
+    def percentile(self, percentile):
+        """
+        This method return value at percentile -> highest value of bucket include the percentile rank
+        (bounded by max recorded value), None if histogram is empty
+        """
+        if not self.total_count:
+            return None
+        rank = max(1, math.ceil(self.total_count * percentile / 100))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                return min(self._bucket_range(index)[1], self.max) * self.resolution
+        return self.max * self.resolution
+
+    def percentiles(self, percentiles=(50, 90, 95, 99)):
+        """
+        This method return dict of percentiles -> {"p50": value, "p90": value...}
+        """
+        return {f"p{p:g}": self.percentile(p) for p in percentiles}
+
+    def mean(self):
+        return (
+            self.total / self.total_count * self.resolution
+            if self.total_count
+            else None
+        )
+
+    def summary(self, percentiles=(50, 90, 95, 99)):
+        """
+        This method return {count, min, mean, max, p50, p90...}
+        """
+        summary = {
+            "count": self.total_count,
+            "min": None if self.min is None else self.min * self.resolution,
+            "mean": self.mean(),
+            "max": None if self.max is None else self.max * self.resolution,
+        }
+        summary.update(self.percentiles(percentiles))
+        return summary
+
+    # ================================================ merge ==========================================================
+    def _check_compatible(self, other):
+        if (self.significant_figures, self.resolution) != (
+            other.significant_figures,
+            other.resolution,
+        ):
+            raise ValueError(
+                f"Can't merge histograms with different configuration: "
+                f"[{self.significant_figures}, {self.resolution}] - [{other.significant_figures}, {other.resolution}]"
+            )
+
+    def merge(self, other):
+        """
+        This method add counts of other histogram (same significant_figures and resolution) into this one
+        """
+        self._check_compatible(other)
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+        self.total_count += other.total_count
+        self.total += other.total
+        for attr, func in (("min", min), ("max", max)):
+            values = [
+                v for v in (getattr(self, attr), getattr(other, attr)) if v is not None
+            ]
+            setattr(self, attr, func(values) if values else None)
+        return self
+
+    @classmethod
+    def merge_all(cls, histograms):
+        """
+        This method return new histogram with counts of all provided histograms
+        """
+        histograms = list(histograms)
+        if not histograms:
+            raise ValueError("No histograms provided")
+        merged = cls(histograms[0].significant_figures, histograms[0].resolution)
+        for histogram in histograms:
+            merged.merge(histogram)
+        return merged
+
+    # ============================================ serialization ======================================================
+    def to_dict(self):
+        """
+        This method return json serializable dict -> counts as sparse [index, count] pairs
+        """
+        return {
+            "significant_figures": self.significant_figures,
+            "resolution": self.resolution,
+            "total_count": self.total_count,
+            "total": self.total,
+            "min": self.min,
+            "max": self.max,
+            "counts": sorted(self.counts.items()),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        histogram = cls(data["significant_figures"], data["resolution"])
+        histogram.counts = {index: count for index, count in data["counts"]}
+        histogram.total_count = data["total_count"]
+        histogram.total = data["total"]
+        histogram.min = data["min"]
+        histogram.max = data["max"]
+        return histogram
+
+    def encode(self):
+        """
+        This method return compact string of histogram -> base64 of zlib compressed json
+        """
+        raw = json.dumps(self.to_dict(), separators=(",", ":")).encode()
+        return base64.b64encode(zlib.compress(raw, 9)).decode()
+
+    @classmethod
+    def decode(cls, encoded):
+        return cls.from_dict(json.loads(zlib.decompress(base64.b64decode(encoded))))
+
+    def dump(self, path):
+        """
+        This method write encoded histogram into file
+        """
+        with open(path, "w") as fp:
+            fp.write(self.encode())
+        return path
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as fp:
+            return cls.decode(fp.read())
+
+    # ============================================== comparison =======================================================
+    @staticmethod
+    def compare(baseline, candidate, thresholds=None):
+        """
+        This method compare candidate run to baseline run by percentiles relative change
+        :param baseline: LatencyHistogram of reference run
+        :param candidate: LatencyHistogram of compared run
+        :param thresholds: dict -> {"p99": 0.2, "max": 0.5...} max allowed relative increase, DEFAULT_THRESHOLDS as default
+        :return: dict -> {"regression": bool, "metrics": {metric: {baseline, candidate, change, threshold, regression}}}
+        """
+        thresholds = thresholds or DEFAULT_THRESHOLDS
+        base_summary, candidate_summary = baseline.summary(), candidate.summary()
+        metrics = {}
+        for metric, threshold in thresholds.items():
+            if metric.startswith("p") and metric not in base_summary:
+                percentile = float(metric[1:])
+                base_value = baseline.percentile(percentile)
+                candidate_value = candidate.percentile(percentile)
+            else:
+                base_value = base_summary[metric]
+                candidate_value = candidate_summary[metric]
+            change = (
+                (candidate_value - base_value) / base_value
+                if base_value and candidate_value is not None
+                else None
+            )
+            metrics[metric] = {
+                "baseline": base_value,
+                "candidate": candidate_value,
+                "change": change,
+                "threshold": threshold,
+                "regression": change is not None and change > threshold,
+            }
+        regression = any(metric["regression"] for metric in metrics.values())
+        if regression:
+            _log.warning(
+                f"Latency regression found on: "
+                f"{[name for name, metric in metrics.items() if metric['regression']]}"
+            )
+        return {"regression": regression, "metrics": metrics}
+
+
+def build_from_jtl(
+    file_path, column="elapsed", label=None, significant_figures=2, resolution=1
+):
+    """
+    This function build histogram from jtl results file -> records are streamed (constant memory)
+    :param file_path: str -> path of jtl \\ csv results file with header line
+    :param column: str -> latency column name ("elapsed", "Latency", "Connect")
+    :param label: str -> count only samples of label, None -> all samples
+    """
+    histogram = LatencyHistogram(significant_figures, resolution)
+    for row in jmeter_records_parsers.iter_records(file_path):
+        if label is None or row["label"] == label:
+            histogram.record(float(row[column]))
+    return histogram
+
+
+def _build_encoded(file_path, kwargs):
+    return build_from_jtl(file_path, **kwargs).encode()
+
+
+def build_from_jtls(file_paths, max_workers=None, **kwargs):
+    """
+    This function build histogram per jtl file on parallel worker processes
+    :param file_paths: list of jtl files paths (e.g. file per injector node)
+    :param max_workers: int -> max worker processes, None -> number of cpus
+    :param kwargs: arguments of build_from_jtl
+    :return: dict -> {file path: LatencyHistogram}, merge them by LatencyHistogram.merge_all
+    """
+    with futures.ProcessPoolExecutor(max_workers=max_workers) as executor:
+        encoded = executor.map(_build_encoded, file_paths, [kwargs] * len(file_paths))
+        return {
+            path: LatencyHistogram.decode(data)
+            for path, data in zip(file_paths, encoded)
+        }
@@ -1,25 +1,175 @@
 """
 This module adapt and provide useful access to postgresSQL DB
 """
+import contextlib
+import json
 import logging
+import time
+import uuid
 
 import psycopg2
+from psycopg2 import extras
 
 _log = logging.getLogger("mc_automation_tools.postgres")
 
+ANY_CHUNK_SIZE = 10000  # max pk values bound into single "= ANY(array)" statement
+TEMP_TABLE_THRESHOLD = 50000  # above this number of pk values - join with temp table
+
+
+class QueryStats:
+    """
+    This class aggregate execution statistics of PGClass queries per method and table:
+        count, latency (total, avg, max), rows and estimated bytes fetched + list of slow queries
+    """
+
+    def __init__(self, max_slow_queries=100):
+        self.max_slow_queries = max_slow_queries
+        self._stats = {}
+        self.slow_queries = []
+
+    def reset(self):
+        """
+        This method clean all collected statistics
+        """
+        self._stats = {}
+        self.slow_queries = []
+
+    def record(self, method, table_name, duration, rows, size):
+        """
+        This method add single query execution to aggregation of its method and table
+        :param duration: float -> seconds
+        :param rows: int -> rows fetched or affected
+        :param size: int -> estimated bytes fetched
+        """
+        key = (method, table_name)
+        if key not in self._stats:
+            self._stats[key] = {
+                "method": method,
+                "table": table_name,
+                "count": 0,
+                "total_sec": 0.0,
+                "max_sec": 0.0,
+                "rows": 0,
+                "bytes": 0,
+            }
+        stat = self._stats[key]
+        stat["count"] += 1
+        stat["total_sec"] += duration
+        stat["max_sec"] = max(stat["max_sec"], duration)
+        stat["rows"] += rows
+        stat["bytes"] += size
+
+    def add_slow_query(self, query_info):
+        """
+        This method keep details of query that passed the slow query threshold -> last max_slow_queries are kept
+        """
+        self.slow_queries.append(query_info)
+        if len(self.slow_queries) > self.max_slow_queries:
+            self.slow_queries.pop(0)
+
+    def report(self):
+        """
+        This method return structured report of all collected statistics
+        :return: dict -> {"total": {...}, "queries": [{method, table, count, total_sec...}], "slow_queries": [...]}
+        """
+        queries = []
+        for stat in self._stats.values():
+            stat = dict(stat)
+            stat["avg_sec"] = stat["total_sec"] / stat["count"]
+            queries.append(stat)
+        queries.sort(key=lambda q: q["total_sec"], reverse=True)
+        total = {
+            "count": sum(q["count"] for q in queries),
+            "total_sec": sum(q["total_sec"] for q in queries),
+            "rows": sum(q["rows"] for q in queries),
+            "bytes": sum(q["bytes"] for q in queries),
+        }
+        return {
+            "total": total,
+            "queries": queries,
+            "slow_queries": list(self.slow_queries),
+        }
+
+
+def _json_path_expression(column, canonic_keys):
+    """
+    This function build jsonb expression of canonic keys path inside json column ->
+        ("column"::jsonb->'key_1'->'key_2') -> same text used on queries and on index creation
+    """
+    search_str = "".join(
+        ["->'" + str(c).replace("'", "''") + "'" for c in canonic_keys]
+    )
+    return f"""("{column}"::jsonb{search_str})"""
+
+
+def _geometry_expression(column, simplify_tolerance=None, as_wkb=False):
+    """
+    This function build select expression of geometry column -> geojson or wkb, optionally simplified
+    """
+    geometry = f'"{column}"'
+    if simplify_tolerance:
+        geometry = (
+            f"ST_SimplifyPreserveTopology({geometry}, {float(simplify_tolerance)})"
+        )
+    if as_wkb:
+        return f"ST_AsBinary({geometry})"
+    return f"st_AsGeoJSON({geometry})"
+
+
+def _estimate_rows_size(rows, sample_size=100):
+    """
+    This function estimate payload size in bytes of fetched rows -> by length of values representation
+    of first sample_size rows, extrapolated to all rows
+    """
+    if not rows:
+        return 0
+    sample = rows[:sample_size]
+    size = 0
+    for row in sample:
+        for value in row:
+            if value is None:
+                continue
+            if isinstance(value, (bytes, bytearray, memoryview)):
+                size += len(value)
+            else:
+                size += len(str(value))
+    return size * len(rows) // len(sample)
+
 
 class PGClass:
     """
     This class create and provide connection to postgres db host
     """
 
-    def __init__(self, host, database, user, password, scheme, port=5432):
+    def __init__(
+        self,
+        host,
+        database,
+        user,
+        password,
+        scheme,
+        port=5432,
+        slow_query_threshold=None,
+        explain_slow_queries=False,
+        collect_query_stats=False,
+    ):
+        """
+        :param slow_query_threshold: float -> seconds, queries longer than that are logged as warning and kept on report
+        :param explain_slow_queries: bool -> run EXPLAIN ANALYZE for slow select queries and add plan to report
+        :param collect_query_stats: bool -> aggregate queries statistics on query_stats (off as default)
+        """
         self.host = host
         self.database = database
         self.user = user
         self.password = password
         self.port = port
         self.scheme = scheme
+        self._column_types = {}
+        self.slow_query_threshold = slow_query_threshold
+        self.explain_slow_queries = explain_slow_queries
+        self.collect_query_stats = collect_query_stats
+        self.query_stats = QueryStats()
+        self._query_hooks = []
 
         try:
             self.conn = psycopg2.connect(
@@ -32,12 +182,121 @@ class PGClass:
         except Exception as e:
             raise ConnectionError(f"Error on connection to DB with error: {str(e)}")
 
+    # ========================================== queries instrumentation ===============================================
+    def add_query_hook(self, hook):
+        """
+        This method register callable that will be called after every query execution with dict of:
+            {method, table, command, duration, rows, bytes, slow}
+        """
+        self._query_hooks.append(hook)
+
+    def remove_query_hook(self, hook):
+        """
+        This method remove registered query hook
+        """
+        self._query_hooks.remove(hook)
+
+    def get_query_report(self):
+        """
+        This method return aggregated statistics of queries executed by this client -> see QueryStats.report
+        """
+        return self.query_stats.report()
+
+    def export_query_report(self, path):
+        """
+        This method write queries statistics report as json file
+        :param path: str -> output file path
+        """
+        with open(path, "w") as fp:
+            json.dump(self.get_query_report(), fp, indent=4, default=str)
+        return path
+
+    def explain_analyze(self, command, params=None):
+        """
+        This method run EXPLAIN ANALYZE over provided query and return the plan lines
+        * the query is actually executed inside savepoint - non select statements are rolled back to it,
+          the caller's open transaction is neither committed nor rolled back
+        """
+        explain_command = f"""EXPLAIN (ANALYZE, BUFFERS) {command}"""
+        cur = self.conn.cursor()
+        try:
+            with self._savepoint(cur) as savepoint:
+                cur.execute(explain_command, params)
+                plan = [row[0] for row in cur.fetchall()]
+                if not command.lstrip().lower().startswith("select"):
+                    cur.execute(f"rollback to savepoint {savepoint};")
+        except Exception as e:
+            _log.error(str(e))
+            raise e
+        finally:
+            cur.close()
+        return plan
+
+    def _execute(self, cur, method, table_name, command, params=None, fetch=False):
+        """
+        This method execute command on provided cursor and record its statistics
+        :param method: name of calling method for statistics aggregation
+        :param fetch: bool -> fetch and return all rows of result
+        :return: list of rows if fetch else None
+        """
+        start = time.perf_counter()
+        cur.execute(command, params)
+        res = cur.fetchall() if fetch else None
+        duration = time.perf_counter() - start
+
+        if (
+            not self.collect_query_stats
+            and not self._query_hooks
+            and not self.slow_query_threshold
+        ):
+            return res
+        rows = len(res) if fetch else max(cur.rowcount, 0)
+        size = _estimate_rows_size(res) if fetch else 0
+        slow = bool(self.slow_query_threshold and duration >= self.slow_query_threshold)
+        if self.collect_query_stats:
+            self.query_stats.record(method, table_name, duration, rows, size)
+        if slow:
+            self._handle_slow_query(method, table_name, command, params, duration)
+        query_info = {
+            "method": method,
+            "table": table_name,
+            "command": command,
+            "duration": duration,
+            "rows": rows,
+            "bytes": size,
+            "slow": slow,
+        }
+        for hook in self._query_hooks:
+            hook(query_info)
+        return res
+
+    def _handle_slow_query(self, method, table_name, command, params, duration):
+        _log.warning(
+            f"Slow query on [{method}] - table [{table_name}] took [{duration:.3f}] sec:\n{command}"
+        )
+        slow_query = {
+            "method": method,
+            "table": table_name,
+            "command": command,
+            "duration": duration,
+            "plan": None,
+        }
+        if self.explain_slow_queries and command.lstrip().lower().startswith("select"):
+            try:
+                slow_query["plan"] = self.explain_analyze(command, params)
+                _log.warning("\n".join(slow_query["plan"]))
+            except Exception as e:
+                _log.error(f"Failed explain slow query with error: {str(e)}")
+        if self.collect_query_stats:
+            self.query_stats.add_slow_query(slow_query)
+
+    # ================================================== queries =======================================================
     def command_execute(self, commands):
         try:
             cur = self.conn.cursor()
 
             for command in commands:
-                cur.execute(command)
+                self._execute(cur, "command_execute", None, command)
             cur.close()
             self.conn.commit()
 
@@ -52,8 +311,9 @@ class PGClass:
         command = f"""SELECT {column_name} FROM "{self.scheme}"."{table_name}";"""
         try:
             cur = self.conn.cursor()
-            cur.execute(command)
-            res = cur.fetchall()
+            res = self._execute(
+                cur, "get_column_by_name", table_name, command, fetch=True
+            )
             cur.close()
         except Exception as e:
             _log.error(str(e))
@@ -65,7 +325,7 @@ class PGClass:
         command = f"""UPDATE "{self.scheme}"."{table_name}" SET "{column}"='{value}' WHERE {pk} = '{pk_value}';"""
         try:
             cur = self.conn.cursor()
-            cur.execute(command)
+            self._execute(cur, "update_value_by_pk", table_name, command)
 
             self.conn.commit()
             cur.close()
@@ -81,8 +341,9 @@ class PGClass:
         command = f"""select st_AsGeoJSON({column}) from "{self.scheme}"."{table_name}" where {pk}='{pk_value}';"""
         try:
             cur = self.conn.cursor()
-            cur.execute(command)
-            res = cur.fetchall()
+            res = self._execute(
+                cur, "polygon_to_geojson", table_name, command, fetch=True
+            )
             cur.close()
         except Exception as e:
             _log.error(str(e))
@@ -90,6 +351,111 @@ class PGClass:
 
         return res
 
+    def polygons_to_geojson(
+        self,
+        column,
+        table_name,
+        pk,
+        pk_values,
+        simplify_tolerance=None,
+        as_wkb=False,
+        pk_type=None,
+    ):
+        """
+        This method query geometries of many rows with single query (chunked by ANY_CHUNK_SIZE values)
+        :param column: geometry column name
+        :param table_name: table name
+        :param pk: primary key
+        :param pk_values: list of pk values
+        :param simplify_tolerance: float -> if provided, geometry simplified by ST_SimplifyPreserveTopology
+        :param as_wkb: bool -> return geometries as WKB bytes instead of geojson strings
+        :param pk_type: str -> sql type of pk column, queried from db catalog if not provided
+        :return: dict -> {pk_value (str): geojson str | wkb bytes}
+        """
+        geometry = _geometry_expression(column, simplify_tolerance, as_wkb)
+        res = self._select_by_pk_values(
+            "polygons_to_geojson",
+            f'"{pk}"::text, {geometry}',
+            table_name,
+            pk,
+            pk_values,
+            pk_type=pk_type,
+        )
+        if as_wkb:
+            return {r[0]: bytes(r[1]) if r[1] is not None else None for r in res}
+        return {r[0]: r[1] for r in res}
+
+    def export_polygons_to_geojson_file(
+        self,
+        column,
+        table_name,
+        pk,
+        output_path,
+        pk_values=None,
+        properties=None,
+        simplify_tolerance=None,
+        batch_size=1000,
+    ):
+        """
+        This method stream geometries into GeoJSON FeatureCollection file -> rows are read with server side cursor
+        by batches, so entire table can be exported without loading it into memory
+        :param column: geometry column name
+        :param table_name: table name
+        :param pk: primary key -> written to each feature properties
+        :param output_path: str -> path of output .geojson file
+        :param pk_values: list of pk values to export -> all table rows if not provided
+        :param properties: list of other columns to write on each feature properties
+        :param simplify_tolerance: float -> if provided, geometry simplified by ST_SimplifyPreserveTopology
+        :param batch_size: int -> number of rows fetched from server on each round trip
+        :return: int -> number of exported features
+        """
+        properties = properties or []
+        columns = ", ".join([f'"{pk}"'] + [f'"{p}"' for p in properties])
+        geometry = _geometry_expression(column, simplify_tolerance, as_wkb=False)
+        command = f'select {columns}, {geometry} from "{self.scheme}"."{table_name}"'
+        params = None
+        if pk_values is not None:
+            pk_type = self._get_column_type(table_name, pk)
+            command = command + f""" where "{pk}" = ANY(%s::{pk_type}[])"""
+            params = (list(dict.fromkeys(str(value) for value in pk_values)),)
+
+        start = time.time()
+        count = 0
+        try:
+            savepoint_cur = self.conn.cursor()
+            with self._savepoint(savepoint_cur):
+                cur = self.conn.cursor(name=f"geojson_export_{uuid.uuid4().hex[:8]}")
+                cur.itersize = batch_size
+                self._execute(
+                    cur, "export_polygons_to_geojson_file", table_name, command, params
+                )
+                with open(output_path, "w") as fp:
+                    fp.write('{"type": "FeatureCollection", "features": [')
+                    for row in cur:
+                        feature_properties = {pk: row[0]}
+                        for idx, prop in enumerate(properties, start=1):
+                            feature_properties[prop] = row[idx]
+                        geometry_json = row[-1] if row[-1] is not None else "null"
+                        if count:
+                            fp.write(",")
+                        fp.write(
+                            f'\n{{"type": "Feature", "geometry": {geometry_json}, '
+                            f'"properties": {json.dumps(feature_properties, default=str)}}}'
+                        )
+                        count += 1
+                    fp.write("\n]}\n")
+                cur.close()
+            savepoint_cur.close()
+        except Exception as e:
+            _log.error(str(e))
+            raise e
+
+        _log.info(
+            f"Exported [{count}] geometries of [{self.scheme}.{table_name}] into [{output_path}] "
+            f"in [{time.time() - start:.2f}] sec"
+        )
+        return count
+
     def delete_row_by_id(self, table_name, pk, pk_value):
         """
         Delete entire row by providing key and value [primary key]
@@ -99,7 +465,7 @@ class PGClass:
         )
         try:
             cur = self.conn.cursor()
-            cur.execute(command)
+            self._execute(cur, "delete_row_by_id", table_name, command)
             self.conn.commit()
             resp = cur.statusmessage
             cur.close()
@@ -115,7 +481,7 @@ class PGClass:
         """
         command = f"""DROP TABLE "{self.scheme}"."{table_name}" CASCADE;"""
         cur = self.conn.cursor()
-        cur.execute(command)
+        self._execute(cur, "drop_table", table_name, command)
         self.conn.commit()
         cur.close()
 
@@ -125,7 +491,7 @@ class PGClass:
         """
         command = f"""TRUNCATE TABLE "{self.scheme}"."{table_name}";"""
         cur = self.conn.cursor()
-        cur.execute(command)
+        self._execute(cur, "truncate_table", table_name, command)
         self.conn.commit()
         cur.close()
 
@@ -137,14 +503,18 @@ class PGClass:
         :param pk: primary key
         :param canonic_keys: list of arguments represent dict canonic order of keys
         :param value: column name to get
+        * query use "?" operator over canonic path, so it can use index created by ensure_json_path_index
         """
 
-        search_str = "->".join(["'" + c + "'" for c in canonic_keys])
-        command = f"""select * from "{self.scheme}"."{table_name}" where "{pk}"->{search_str}->'{value}' is not NULL;"""
+        search_str = _json_path_expression(pk, canonic_keys)
+        command = (
+            f"""select * from "{self.scheme}"."{table_name}" where {search_str} ? %s;"""
+        )
         try:
             cur = self.conn.cursor()
-            cur.execute(command)
-            res = cur.fetchall()
+            res = self._execute(
+                cur, "get_by_json_key", table_name, command, (value,), fetch=True
+            )
             cur.close()
         except Exception as e:
             _log.error(str(e))
@@ -159,13 +529,16 @@ class PGClass:
         :param pk: primary key
         :param canonic_keys: list of arguments represent dict canonic order of keys
         :param value: column name to get
+        * for big tables prefer delete_by_json_key_batched -> avoid long locks
         """
 
-        search_str = "->".join(["'" + c + "'" for c in canonic_keys])
-        command = f"""delete from "{self.scheme}"."{table_name}" where "{pk}"->{search_str}->'{value}' is not NULL;"""
+        search_str = _json_path_expression(pk, canonic_keys)
+        command = (
+            f"""delete from "{self.scheme}"."{table_name}" where {search_str} ? %s;"""
+        )
         try:
             cur = self.conn.cursor()
-            cur.execute(command)
+            self._execute(cur, "delete_by_json_key", table_name, command, (value,))
             self.conn.commit()
             resp = cur.statusmessage
             cur.close()
@@ -174,26 +547,165 @@ class PGClass:
             _log.error(str(e))
             raise e
 
-    def get_by_n_argument(self, table_name, pk, pk_values, column):
+    def delete_by_json_key_batched(
+        self, table_name, pk, canonic_keys, value, batch_size=1000
+    ):
         """
-        This method send query with multiple number of pk arguments
+        This method delete rows include value on canonic json path (as delete_by_json_key) by batches,
+        each batch limited to batch_size rows and committed separately -> locks are held only for short time
         :param table_name: table name
-        :param pk: primary key
-        :param pk_values: list of arguments
-        :param column: column name to get
+        :param pk: json column name
+        :param canonic_keys: list of arguments represent dict canonic order of keys
+        :param value: key name expected on the end of canonic path
+        :param batch_size: int -> max rows deleted on single transaction
+        :return: int -> total number of deleted rows
         """
-        for idx, i in enumerate(pk_values):
-            pk_values[idx] = f"'{i}'"
-        args_str = ",".join(pk_values)
-        command = f"""select "{column}" from "{self.scheme}"."{table_name}" where "{pk}" in ({args_str})"""
+        search_str = _json_path_expression(pk, canonic_keys)
+        command = (
+            f"""delete from "{self.scheme}"."{table_name}" where ctid = ANY(ARRAY("""
+            f"""select ctid from "{self.scheme}"."{table_name}" where {search_str} ? %s limit %s));"""
+        )
+        total = 0
         try:
             cur = self.conn.cursor()
-            cur.execute(command)
-            res = cur.fetchall()
+            while True:
+                self._execute(
+                    cur,
+                    "delete_by_json_key_batched",
+                    table_name,
+                    command,
+                    (value, batch_size),
+                )
+                deleted = cur.rowcount
+                self.conn.commit()
+                total += deleted
+                if deleted < batch_size:
+                    break
             cur.close()
         except Exception as e:
             _log.error(str(e))
+            self.conn.rollback()
             raise e
+        return total
+
+    def get_by_json_containment(self, table_name, column, document):
+        """
+        This method return rows that json column contain provided document (json "@>" operator)
+            Sample: {"metadata": {"productId": "some_id"}} -> rows that column["metadata"]["productId"] == "some_id"
+        * can use GIN index on entire column -> ensure_json_path_index(table_name, column)
+        :param table_name: table name
+        :param column: json column name
+        :param document: dict -> partial json document to search
+        """
+        command = f"""select * from "{self.scheme}"."{table_name}" where "{column}"::jsonb @> %s::jsonb;"""
+        try:
+            cur = self.conn.cursor()
+            res = self._execute(
+                cur,
+                "get_by_json_containment",
+                table_name,
+                command,
+                (json.dumps(document),),
+                fetch=True,
+            )
+            cur.close()
+        except Exception as e:
+            _log.error(str(e))
+            raise e
+        return res
+
+    def ensure_json_path_index(
+        self, table_name, column, canonic_keys=None, index_name=None, concurrently=False
+    ):
+        """
+        This method create (if not exists) GIN index over json column or over canonic path inside it:
+            - without canonic_keys -> index serve get_by_json_containment ("@>") and top level keys search ("?")
+            - with canonic_keys -> index serve get_by_json_key \ delete_by_json_key of same canonic keys
+        :param table_name: table name
+        :param column: json column name
+        :param canonic_keys: list of keys represent the path used on get_by_json_key
+        :param index_name: str -> name of index, generated from table, column and keys if not provided
+        :param concurrently: bool -> create index without locking table writes (slower, out of transaction)
+        :return: str -> index name
+        """
+        canonic_keys = canonic_keys or []
+        if not index_name:
+            index_name = "_".join([table_name, column] + list(canonic_keys) + ["gin"])
+            index_name = index_name.lower()[:63]
+        search_str = _json_path_expression(column, canonic_keys)
+        command = (
+            f"""create index {"concurrently " if concurrently else ""}if not exists "{index_name}" """
+            f"""on "{self.scheme}"."{table_name}" using gin (({search_str}));"""
+        )
+        try:
+            if concurrently:
+                self.conn.commit()
+                self.conn.autocommit = True
+            cur = self.conn.cursor()
+            self._execute(cur, "ensure_json_path_index", table_name, command)
+            cur.close()
+            if not concurrently:
+                self.conn.commit()
+        except Exception as e:
+            _log.error(str(e))
+            if not concurrently:
+                self.conn.rollback()
+            raise e
+        finally:
+            if concurrently:
+                self.conn.autocommit = False
+
+        if not self.is_index_valid(index_name):
+            raise RuntimeError(
+                f"Index [{index_name}] on [{self.scheme}.{table_name}] was not created as valid index"
+            )
+        return index_name
+
+    def is_index_valid(self, index_name):
+        """
+        This method check that index exists on scheme and valid for use by queries planner
+        :param index_name: str -> name of index
+        :return: bool
+        """
+        command = """select i.indisvalid from pg_index i
+        join pg_class c on c.oid = i.indexrelid
+        join pg_namespace n on n.oid = c.relnamespace
+        where n.nspname = %s and c.relname = %s"""
+        try:
+            cur = self.conn.cursor()
+            res = self._execute(
+                cur,
+                "is_index_valid",
+                None,
+                command,
+                (self.scheme, index_name),
+                fetch=True,
+            )
+            cur.close()
+        except Exception as e:
+            _log.error(str(e))
+            raise e
+        return bool(res and res[0][0])
+
+    def get_by_n_argument(self, table_name, pk, pk_values, column, pk_type=None):
+        """
+        This method send query with multiple number of pk arguments
+        * values are bound as array -> "pk" = ANY(%s), executed by chunks of ANY_CHUNK_SIZE values,
+          above TEMP_TABLE_THRESHOLD values they are loaded into temp table and joined
+        :param table_name: table name
+        :param pk: primary key
+        :param pk_values: list of arguments -> not changed by the method
+        :param column: column name to get
+        :param pk_type: str -> sql type of pk column (uuid, text...), queried from db catalog if not provided
+        """
+        res = self._select_by_pk_values(
+            "get_by_n_argument",
+            f'"{column}"',
+            table_name,
+            pk,
+            pk_values,
+            pk_type=pk_type,
+        )
         res = [r[0] for r in res]
         return res
 
@@ -219,7 +731,7 @@ class PGClass:
 
         # insert_query = f"""insert into {table_name} ({pk}, {column}) values {records_list_template}"""
         cur = self.conn.cursor()
-        cur.execute(update_query)
+        self._execute(cur, "update_multi_with_multi", table_name, update_query)
         # cur.execute(update)
 
         self.conn.commit()
@@ -237,10 +749,11 @@ class PGClass:
 
         try:
             cur = self.conn.cursor()
-            cur.execute(command)
+            res = self._execute(
+                cur, "get_rows_by_order", table_name, command, fetch=True
+            )
             if return_as_dict:
                 columns = list(cur.description)
-                res = cur.fetchall()
 
                 results = []
                 for row in res:
@@ -252,7 +765,6 @@ class PGClass:
                 return results
 
             else:
-                res = cur.fetchall()
                 cur.close()
                 return res
         except Exception as e:
@@ -289,10 +801,11 @@ class PGClass:
             command = f"""select * from "{self.scheme}"."{table_name}" where ({key_value_stat}) order by "{order_key}" {asc_desc}"""
         try:
             cur = self.conn.cursor()
-            cur.execute(command)
+            res = self._execute(
+                cur, "get_rows_by_keys", table_name, command, fetch=True
+            )
             if return_as_dict:
                 columns = list(cur.description)
-                res = cur.fetchall()
 
                 results = []
                 for row in res:
@@ -304,7 +817,6 @@ class PGClass:
                 return results
 
             else:
-                res = cur.fetchall()
                 cur.close()
                 return res
         except Exception as e:
@@ -332,27 +844,26 @@ class PGClass:
     #     for key in columns:
     #
     #     pass
-    def get_cloumns_by_n_argument(self, table_name, pk, pk_values, columns):
+    def get_cloumns_by_n_argument(
+        self, table_name, pk, pk_values, columns, pk_type=None
+    ):
         """
         This method send query with multiple number of pk arguments for spacifics columns
+        * same array binding \ chunking \ temp table logic as get_by_n_argument
         :param table_name: table name
         :param pk: primary key
-        :param pk_values: list of arguments
+        :param pk_values: list of arguments -> not changed by the method
         :param column: column names to get
+        :param pk_type: str -> sql type of pk column (uuid, text...), queried from db catalog if not provided
         """
-        for idx, i in enumerate(pk_values):
-            pk_values[idx] = f"'{i}'"
-        args_str = ",".join(pk_values)
-        command = f"""select {columns} from "{self.scheme}"."{table_name}" where "{pk}" in ({args_str})"""
-        try:
-            cur = self.conn.cursor()
-            cur.execute(command)
-            res = cur.fetchall()
-            cur.close()
-        except Exception as e:
-            _log.error(str(e))
-            raise e
-        return res
+        return self._select_by_pk_values(
+            "get_cloumns_by_n_argument",
+            columns,
+            table_name,
+            pk,
+            pk_values,
+            pk_type=pk_type,
+        )
 
     def get_columns_by_like_statements(
         self, columns, table_name, pk, identifiers, condition_param
@@ -381,8 +892,9 @@ class PGClass:
         command = f"""select {columns} from "{self.scheme}"."{table_name}" where {like_statement}"""
         try:
             cur = self.conn.cursor()
-            cur.execute(command)
-            res = cur.fetchall()
+            res = self._execute(
+                cur, "get_columns_by_like_statements", table_name, command, fetch=True
+            )
             cur.close()
         except Exception as e:
             _log.error(str(e))
@@ -400,8 +912,142 @@ class PGClass:
         command = f"""select {columns} from "{self.scheme}"."{table_name}" where {pk} = '{pk_value}' """
         try:
             cur = self.conn.cursor()
-            cur.execute(command)
-            res = cur.fetchall()
+            res = self._execute(
+                cur, "get_columns_by_pk_equality", table_name, command, fetch=True
+            )
+            cur.close()
+        except Exception as e:
+            _log.error(str(e))
+            raise e
+        return res
+
+    def _get_column_type(self, table_name, column):
+        """
+        This method return sql type of column (as format_type provide it) from db catalog, cached per table-column
+        """
+        key = (table_name, column)
+        if key not in self._column_types:
+            command = """select format_type(a.atttypid, a.atttypmod) from pg_attribute a
+            where a.attrelid = %s::regclass and a.attname = %s and not a.attisdropped"""
+            try:
+                cur = self.conn.cursor()
+                res = self._execute(
+                    cur,
+                    "_get_column_type",
+                    table_name,
+                    command,
+                    (f'"{self.scheme}"."{table_name}"', column),
+                    fetch=True,
+                )
+                res = res[0] if res else None
+                cur.close()
+            except Exception as e:
+                _log.error(str(e))
+                raise e
+            if not res:
+                raise ValueError(
+                    f"Column [{column}] not found on table [{self.scheme}.{table_name}]"
+                )
+            self._column_types[key] = res[0]
+        return self._column_types[key]
+
+    def _select_by_pk_values(
+        self,
+        method,
+        columns,
+        table_name,
+        pk,
+        pk_values,
+        pk_type=None,
+        chunk_size=ANY_CHUNK_SIZE,
+        temp_table_threshold=TEMP_TABLE_THRESHOLD,
+    ):
+        """
+        This method select columns of all rows that pk value is on provided list of values
+        :param method: name of calling method for statistics aggregation
+        :param columns: str -> columns statement of the select
+        :param pk_values: list of pk values -> duplicated values are ignored (as on IN statement)
+        :param pk_type: str -> sql type of pk, queried by _get_column_type if not provided
+        :return: list of rows (tuples)
+        """
+        values = list(dict.fromkeys(str(value) for value in pk_values))
+        if not values:
+            return []
+        if len(values) > temp_table_threshold:
+            return self._select_by_temp_table(
+                method, columns, table_name, pk, values, chunk_size
+            )
+
+        if not pk_type:
+            pk_type = self._get_column_type(table_name, pk)
+        command = f"""select {columns} from "{self.scheme}"."{table_name}" where "{pk}" = ANY(%s::{pk_type}[])"""
+        res = []
+        try:
+            cur = self.conn.cursor()
+            for idx in range(0, len(values), chunk_size):
+                res.extend(
+                    self._execute(
+                        cur,
+                        method,
+                        table_name,
+                        command,
+                        (values[idx : idx + chunk_size],),
+                        fetch=True,
+                    )
+                )
+            cur.close()
+        except Exception as e:
+            _log.error(str(e))
+            raise e
+        return res
+
+    @contextlib.contextmanager
+    def _savepoint(self, cur):
+        """
+        This method run block of statements inside savepoint -> on error only the block is rolled back,
+        the caller's open transaction is neither committed nor rolled back
+        * yield the savepoint name
+        """
+        savepoint = f"sp_{uuid.uuid4().hex[:8]}"
+        cur.execute(f"savepoint {savepoint};")
+        try:
+            yield savepoint
+        except Exception:
+            cur.execute(f"rollback to savepoint {savepoint};")
+            raise
+        cur.execute(f"release savepoint {savepoint};")
+
+    def _select_by_temp_table(
+        self, method, columns, table_name, pk, values, chunk_size
+    ):
+        """
+        This method load pk values into temp table (same type as pk column) and select rows matching its values
+        * runs inside savepoint and drops the temp table explicitly -> caller's open transaction is not ended
+        """
+        temp_table = f"tmp_pk_values_{uuid.uuid4().hex[:8]}"
+        create_command = (
+            f"""create temp table "{temp_table}" as """
+            f"""select "{pk}" as pk_value from "{self.scheme}"."{table_name}" with no data"""
+        )
+        insert_command = f"""insert into "{temp_table}" (pk_value) values %s"""
+        command = (
+            f"""select {columns} from "{self.scheme}"."{table_name}" """
+            f"""where "{pk}" in (select pk_value from "{temp_table}")"""
+        )
+        try:
+            cur = self.conn.cursor()
+            with self._savepoint(cur):
+                self._execute(cur, method, table_name, create_command)
+                for idx in range(0, len(values), chunk_size):
+                    extras.execute_values(
+                        cur,
+                        insert_command,
+                        [(value,) for value in values[idx : idx + chunk_size]],
+                        page_size=chunk_size,
+                    )
+                cur.execute(f"""analyze "{temp_table}";""")
+                res = self._execute(cur, method, table_name, command, fetch=True)
+                cur.execute(f"""drop table "{temp_table}";""")
             cur.close()
         except Exception as e:
             _log.error(str(e))
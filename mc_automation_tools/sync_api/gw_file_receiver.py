@@ -1,19 +1,25 @@
 """
 This module will wrap and provide api's functionality of layer spec api of sync services
 """
+import hashlib
 import logging
+import os
+import time
 
 from mc_automation_tools import base_requests, common
 from mc_automation_tools.configuration import config
 
 _log = logging.getLogger("mc_automation_tools.sync_api.gw_file_receiver")
 
+UPLOAD_CHUNK_SIZE = 1024 * 1024  # bytes read per chunk while streaming file upload
+
 
 class FileReceiver:
     __fileReceiver = "fileReceiver"
 
     def __init__(self, end_point_url):
         self.__end_point_url = end_point_url
+        self.last_upload_stats = None
 
     @property
     def get_class_params(self):
@@ -21,12 +27,28 @@ class FileReceiver:
         return params
 
     # ========================================== gw file receiver api's ================================================
-    def send_to_file_receiver(self, file_name, raw_data, image=True):
+    def send_to_file_receiver(
+        self,
+        file_name,
+        raw_data=None,
+        image=True,
+        chunk_size=UPLOAD_CHUNK_SIZE,
+        checksum=None,
+        session=None,
+        file_path=None,
+    ):
         """
         This method will upload layer metadata + raw data to core's storage and trigger sync job
+        * file path or file-like raw_data is streamed by chunks (chunked transfer encoding) -> never loaded to memory
+        * str raw_data is always sent as is -> file path should be provided as file_path or os.PathLike raw_data
+        * statistics of the upload are kept on self.last_upload_stats -> {file_name, bytes, duration, throughput, checksum}
         :param file_name: str -> resourceId [product id] + layer version [product version] -> "productId-productVersion"
-        :param raw_data: str -> target of destination of synchronization
+        :param raw_data: bytes \\ str of data, os.PathLike path of file or file-like object opened in binary mode
         :param image: str -> upload image or toc file -> default image [image=True] for toc [image=False]
+        :param chunk_size: int -> bytes per chunk on streaming upload
+        :param checksum: str -> hashlib algorithm name (e.g. "md5", "sha256") to calculate on the fly, None -> no checksum
+        :param session: requests.Session -> reuse connections of session (see base_requests.create_session)
+        :param file_path: str -> path of file to upload instead of raw_data
         :return: dict -> {status_code, {"tilesCount": int}}
         """
         url = common.combine_url(self.__end_point_url, self.__fileReceiver)
@@ -34,9 +56,41 @@ class FileReceiver:
         if image:
             header = {"Content-Type": "application/octet-stream"}
         params = {"filename": file_name}
-        resp = base_requests.send_post_binary_request(
-            url=url, data=raw_data, header=header, params=params
-        )
+        hasher = hashlib.new(checksum) if checksum else None
+        counter = {"bytes": 0}
+
+        file_obj = None
+        if file_path is None and isinstance(raw_data, os.PathLike):
+            file_path = raw_data
+        if file_path is not None:
+            file_obj = open(file_path, "rb")
+            data = _iter_chunks(file_obj, chunk_size, hasher, counter)
+        elif hasattr(raw_data, "read"):
+            data = _iter_chunks(raw_data, chunk_size, hasher, counter)
+        else:
+            data = raw_data
+            raw_bytes = raw_data.encode() if isinstance(raw_data, str) else raw_data
+            counter["bytes"] = len(raw_bytes)
+            if hasher:
+                hasher.update(raw_bytes)
+
+        start = time.time()
+        try:
+            resp = base_requests.send_post_binary_request(
+                url=url, data=data, header=header, params=params, session=session
+            )
+        finally:
+            if file_obj:
+                file_obj.close()
+        duration = time.time() - start
+        self.last_upload_stats = {
+            "file_name": file_name,
+            "bytes": counter["bytes"],
+            "duration": duration,
+            "throughput": counter["bytes"] / duration if duration else None,
+            "checksum": hasher.hexdigest() if hasher else None,
+        }
+        _log.debug(f"Upload statistics: {self.last_upload_stats}")
 
         status_code, content_dict = common.response_parser(resp)
         if status_code != config.ResponseCode.Ok.value:
@@ -45,3 +99,18 @@ class FileReceiver:
                 f" return with error:[{status_code}],error msg:[{content_dict}]"
             )
         return status_code, content_dict
+
+
+def _iter_chunks(file_obj, chunk_size, hasher=None, counter=None):
+    """
+    This generator read file-like object by chunks -> update hasher and bytes counter with each chunk
+    """
+    while True:
+        chunk = file_obj.read(chunk_size)
+        if not chunk:
+            return
+        if hasher:
+            hasher.update(chunk)
+        if counter is not None:
+            counter["bytes"] += len(chunk)
+        yield chunk
@@ -3,6 +3,7 @@ This module will wrap and provide api's functionality of layer spec api of sync
 """
 import json
 import logging
+import threading
 import time
 
 from mc_automation_tools import base_requests, common
@@ -71,3 +72,141 @@ class LayerSpec:
                 f"[updates_tile_count]:failed update tile count, return with error:[{status_code}]:error msg:[{content_dict}]"
             )
         return status_code, content_dict
+
+    # ============================================== batch api's =======================================================
+    def get_tiles_counts(self, layer_targets, max_workers=8):
+        """
+        This method query tile counts of many layer-target pairs concurrently
+        :param layer_targets: list of tuples -> [(layer_id, target)]
+        :param max_workers: int -> max concurrent requests
+        :return: dict -> {(layer_id, target): tiles count}, None value for pair failed on query
+        """
+        results = common.run_concurrently(
+            self.get_tiles_count, list(layer_targets), max_workers=max_workers
+        )
+        return {
+            tuple(pair): res["result"][1].get("tilesCount") if res["success"] else None
+            for pair, res in zip(layer_targets, results)
+        }
+
+    def updates_tiles_counts(self, updates, max_workers=8):
+        """
+        This method update tile counts (tilesBatchCount) of many layer-target pairs concurrently
+        :param updates: dict -> {(layer_id, target): tiles batch count}
+        :param max_workers: int -> max concurrent requests
+        :return: dict -> {(layer_id, target): error message or None on success}
+        """
+        args = [
+            (layer_id, target, {"tilesBatchCount": count})
+            for (layer_id, target), count in updates.items()
+        ]
+        results = common.run_concurrently(
+            self.updates_tile_count, args, max_workers=max_workers
+        )
+        return {pair: res["error"] for pair, res in zip(updates, results)}
+
+
+class TileCountAccumulator:
+    """
+    This class coalesce many small tiles count increments into periodic batch updates of LayerSpec
+    * increments are summed per layer-target and sent by flush() -> called every flush_interval seconds
+      by background thread (start or "with" statement) or when pending tiles reach flush_count
+    * failed updates are kept and retried on next flush
+    * usage example:
+        with TileCountAccumulator(LayerSpec(url), flush_interval=5) as accumulator:
+            accumulator.add("productId-productVersion", "target", 100)
+    """
+
+    def __init__(self, layer_spec, flush_interval=5, flush_count=None, max_workers=8):
+        """
+        :param layer_spec: LayerSpec instance
+        :param flush_interval: float -> seconds between background flushes
+        :param flush_count: int -> flush immediately when pending tiles sum reach flush_count, None -> by interval only
+        :param max_workers: int -> max concurrent update requests on flush
+        """
+        self.layer_spec = layer_spec
+        self.flush_interval = flush_interval
+        self.flush_count = flush_count
+        self.max_workers = max_workers
+        self.stats = {"increments": 0, "flushes": 0, "requests": 0, "failures": 0}
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def add(self, layer_id, target, count):
+        """
+        This method add tiles count increment of layer-target
+        """
+        with self._lock:
+            key = (layer_id, target)
+            self._pending[key] = self._pending.get(key, 0) + count
+            self.stats["increments"] += 1
+            should_flush = (
+                self.flush_count is not None
+                and sum(self._pending.values()) >= self.flush_count
+            )
+        if should_flush:
+            self.flush()
+
+    def flush(self):
+        """
+        This method send pending increments -> single update per layer-target
+        :return: dict -> {(layer_id, target): error message or None on success}
+        """
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+            if not pending:
+                return {}
+            errors = self.layer_spec.updates_tiles_counts(pending, self.max_workers)
+            failed = {pair: pending[pair] for pair, error in errors.items() if error}
+            with self._lock:
+                for pair, count in failed.items():
+                    self._pending[pair] = self._pending.get(pair, 0) + count
+                self.stats["flushes"] += 1
+                self.stats["requests"] += len(pending)
+                self.stats["failures"] += len(failed)
+            if failed:
+                _log.warning(
+                    f"Failed update tile counts of {list(failed)}, will retry on next flush"
+                )
+            return errors
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception as e:
+                _log.error(f"Failed flush tile counts with error: {str(e)}")
+
+    def start(self):
+        """
+        This method start background thread that flush every flush_interval seconds
+        """
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="tile-count-accumulator", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """
+        This method stop background thread and flush remaining increments -> failed ones are left on self._pending
+        """
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+        errors = self.flush()
+        if self._pending:
+            _log.error(f"Tile counts left not updated after stop: {self._pending}")
+        return errors
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
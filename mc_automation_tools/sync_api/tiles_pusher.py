@@ -0,0 +1,215 @@
+"""
+This module push tiles pyramid (local directory or s3 prefix) to gateway file receiver concurrently:
+    bounded workers, connection reuse per worker thread, resumable progress state file and tiles/sec summary
+"""
+import json
+import logging
+import os
+import threading
+import time
+from concurrent import futures
+
+from mc_automation_tools import base_requests
+
+_log = logging.getLogger("mc_automation_tools.sync_api.tiles_pusher")
+
+TILES_EXTENSIONS = (".png", ".jpg", ".jpeg")
+
+
+def iter_tiles_dir(root_dir, extensions=TILES_EXTENSIONS):
+    """
+    This generator walk tiles pyramid directory and yield tiles paths relative to root_dir -> "z/x/y.png"
+    """
+    for root, dirs, files in os.walk(root_dir):
+        dirs.sort()
+        for file in sorted(files):
+            if file.lower().endswith(extensions):
+                yield os.path.relpath(os.path.join(root, file), root_dir).replace(
+                    os.sep, "/"
+                )
+
+
+def iter_tiles_s3(s3_client, bucket_name, prefix, extensions=TILES_EXTENSIONS):
+    """
+    This generator list tiles objects under s3 prefix (page by page) and yield keys relative to prefix
+    :param s3_client: s3storage.S3Client instance
+    """
+    prefix = prefix.rstrip("/") + "/"
+    paginator = s3_client.get_client().get_paginator("list_objects_v2")
+    for page in paginator.paginate(Bucket=bucket_name, Prefix=prefix):
+        for obj in page.get("Contents", []):
+            if obj["Key"].lower().endswith(extensions):
+                yield obj["Key"][len(prefix) :]
+
+
+class TilesPusher:
+    """
+    This class send tiles to gateway file receiver (FileReceiver.send_to_file_receiver) with bounded workers
+    * each worker thread send over its own pooled session -> connections to gateway host are reused
+    * pushed tiles are appended to state file -> on next run (same state file) they are skipped
+    * usage example:
+        pusher = TilesPusher(FileReceiver(url), "productId-productVersion", max_workers=16, state_path="/tmp/push")
+        summary = pusher.push_dir("/layers/productId/productVersion")
+    """
+
+    def __init__(
+        self,
+        file_receiver,
+        file_name_prefix="",
+        max_workers=8,
+        state_path=None,
+        log_every=1000,
+    ):
+        """
+        :param file_receiver: FileReceiver instance
+        :param file_name_prefix: str -> prefix joined to tile relative path as file name -> "<prefix>/z/x/y.png"
+        :param max_workers: int -> max concurrent uploads
+        :param state_path: str -> path of progress state file, None -> not resumable
+        :param log_every: int -> log progress every log_every tiles
+        """
+        self.file_receiver = file_receiver
+        self.file_name_prefix = file_name_prefix
+        self.max_workers = max_workers
+        self.state_path = state_path
+        self.log_every = log_every
+        self._local = threading.local()
+        self._sessions = []
+
+    def _get_session(self):
+        """
+        This method return session of current worker thread -> created on first use, closed at end of push
+        """
+        if not hasattr(self._local, "session"):
+            self._local.session = base_requests.create_session(pool_size=1)
+            self._sessions.append(self._local.session)
+        return self._local.session
+
+    def _close_sessions(self):
+        for session in self._sessions:
+            session.close()
+        self._sessions = []
+        self._local = threading.local()
+
+    def load_state(self):
+        """
+        This method return set of tiles already pushed according state file
+        """
+        if not self.state_path or not os.path.exists(self.state_path):
+            return set()
+        with open(self.state_path) as fp:
+            return {line.strip() for line in fp if line.strip()}
+
+    def reset_state(self):
+        """
+        This method remove state file -> next push will send all tiles
+        """
+        if self.state_path and os.path.exists(self.state_path):
+            os.remove(self.state_path)
+
+    def _file_name(self, tile):
+        if not self.file_name_prefix:
+            return tile
+        return "/".join([self.file_name_prefix.rstrip("/"), tile])
+
+    def push_dir(self, root_dir, extensions=TILES_EXTENSIONS):
+        """
+        This method push all tiles of local pyramid directory
+        :return: dict -> summary (see push)
+        """
+
+        def _open(tile):
+            path = os.path.join(root_dir, tile)
+            return open(path, "rb"), os.path.getsize(path)
+
+        return self.push(iter_tiles_dir(root_dir, extensions), _open)
+
+    def push_s3(self, s3_client, bucket_name, prefix, extensions=TILES_EXTENSIONS):
+        """
+        This method push all tiles under s3 prefix -> objects are read from s3 and sent to file receiver
+        :param s3_client: s3storage.S3Client instance
+        :return: dict -> summary (see push)
+        """
+        client = s3_client.get_client()
+        prefix = prefix.rstrip("/") + "/"
+
+        def _open(tile):
+            obj = client.get_object(Bucket=bucket_name, Key=prefix + tile)
+            return obj["Body"], obj["ContentLength"]
+
+        return self.push(
+            iter_tiles_s3(s3_client, bucket_name, prefix, extensions), _open
+        )
+
+    def push(self, tiles, open_tile):
+        """
+        This method push tiles concurrently -> tiles are consumed lazily, at most 2 * max_workers uploads in flight
+        * tiles are small -> each tile is read into memory and sent as bytes (with content length, not chunked)
+        :param tiles: iterable of tiles relative paths
+        :param open_tile: callable(tile) -> (binary file-like object, size in bytes)
+        :return: dict -> {total, pushed, skipped, failed, bytes, duration, tiles_per_sec, failed_tiles}
+        """
+        done = self.load_state()
+        summary = {"total": 0, "pushed": 0, "skipped": 0, "failed": 0, "bytes": 0}
+        failed_tiles = []
+        state_file = open(self.state_path, "a") if self.state_path else None
+
+        def _push(tile):
+            data, size = open_tile(tile)
+            try:
+                raw_data = data.read()
+            finally:
+                data.close()
+            self.file_receiver.send_to_file_receiver(
+                self._file_name(tile), raw_data, session=self._get_session()
+            )
+            return size
+
+        def _collect(future, tile):
+            try:
+                size = future.result()
+            except Exception as e:
+                _log.error(f"Failed push tile [{tile}] with error: {str(e)}")
+                summary["failed"] += 1
+                failed_tiles.append(tile)
+                return
+            summary["pushed"] += 1
+            summary["bytes"] += size
+            if state_file:
+                state_file.write(tile + "\n")
+                state_file.flush()
+            if summary["pushed"] % self.log_every == 0:
+                elapsed = time.time() - start
+                _log.info(
+                    f"Pushed [{summary['pushed']}] tiles, [{summary['pushed'] / elapsed:.1f}] tiles/sec"
+                )
+
+        start = time.time()
+        try:
+            with futures.ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                pending = {}
+                for tile in tiles:
+                    summary["total"] += 1
+                    if tile in done:
+                        summary["skipped"] += 1
+                        continue
+                    pending[executor.submit(_push, tile)] = tile
+                    if len(pending) >= 2 * self.max_workers:
+                        finished, _ = futures.wait(
+                            pending, return_when=futures.FIRST_COMPLETED
+                        )
+                        for future in finished:
+                            _collect(future, pending.pop(future))
+                for future in futures.as_completed(list(pending)):
+                    _collect(future, pending.pop(future))
+        finally:
+            if state_file:
+                state_file.close()
+            self._close_sessions()
+
+        summary["duration"] = time.time() - start
+        summary["tiles_per_sec"] = (
+            summary["pushed"] / summary["duration"] if summary["duration"] else None
+        )
+        _log.info(f"Tiles push summary:\n{json.dumps(summary, indent=4)}")
+        summary["failed_tiles"] = failed_tiles
+        return summary
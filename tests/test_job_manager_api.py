@@ -0,0 +1,38 @@
+"""Unittest for job manager api shared components"""
+from mc_automation_tools.ingestion_api import job_manager_api
+
+
+def test_adaptive_poll_backoff_on_stall():
+    """
+    This check that interval grows while there is no progress and bounded by max interval
+    """
+    poll = job_manager_api.AdaptivePollInterval(min_interval=0.5, max_interval=4)
+    assert poll.next_interval(0, 10, now=0) == 0.5
+    intervals = [poll.next_interval(0, 10, now=t) for t in range(1, 10)]
+    assert intervals == sorted(intervals)
+    assert intervals[-1] == 4
+
+
+def test_adaptive_poll_speed_up_near_completion():
+    """
+    This check that interval derived from estimated time to completion by measured throughput
+    """
+    poll = job_manager_api.AdaptivePollInterval(
+        min_interval=0.5, max_interval=20, eta_fraction=0.25
+    )
+    poll.next_interval(0, 100, now=0)
+    far = poll.next_interval(10, 100, now=10)  # 1 task/sec -> eta 90 sec
+    assert far == 20
+    near = poll.next_interval(96, 100, now=96)  # eta 4 sec
+    assert near == 1
+    assert poll.next_interval(100, 100, now=100) == 0.5
+
+
+def test_adaptive_poll_stall_bounded_by_eta():
+    """
+    This check that back off on stall will not pass expected completion time
+    """
+    poll = job_manager_api.AdaptivePollInterval(min_interval=0.5, max_interval=20)
+    poll.next_interval(0, 10, now=0)
+    poll.next_interval(8, 10, now=8)  # 1 task/sec -> eta 2 sec
+    assert poll.next_interval(8, 10, now=9) <= 1
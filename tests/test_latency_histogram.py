@@ -0,0 +1,46 @@
+"""Unittest for mergeable latency histogram"""
+import random
+
+from mc_automation_tools.parse.latency_histogram import LatencyHistogram
+
+
+def test_percentiles_relative_error():
+    """
+    This check percentiles are within precision of significant figures from exact percentiles
+    """
+    values = [random.randint(1, 100000) for _ in range(10000)]
+    histogram = LatencyHistogram(significant_figures=2).record_many(values)
+    ordered = sorted(values)
+    for percentile in (50, 90, 99):
+        exact = ordered[int(len(ordered) * percentile / 100) - 1]
+        assert abs(histogram.percentile(percentile) - exact) <= exact * 0.01 + 1
+    assert histogram.percentile(100) == max(values)
+
+
+def test_merge_and_serialization():
+    """
+    This check that merged histograms equal histogram of all values and survive encode-decode
+    """
+    first, second = [random.randint(1, 5000) for _ in range(1000)], list(
+        range(1000, 3000)
+    )
+    merged = LatencyHistogram.merge_all(
+        [
+            LatencyHistogram.decode(LatencyHistogram().record_many(first).encode()),
+            LatencyHistogram().record_many(second),
+        ]
+    )
+    combined = LatencyHistogram().record_many(first + second)
+    assert merged.to_dict() == combined.to_dict()
+
+
+def test_compare_regression():
+    """
+    This check that regression flagged only for metrics exceed threshold
+    """
+    baseline = LatencyHistogram().record_many(range(1, 1001))
+    candidate = LatencyHistogram().record_many(list(range(1, 1001)) + [5000] * 50)
+    result = LatencyHistogram.compare(baseline, candidate, {"p50": 0.1, "p99": 0.2})
+    assert result["regression"]
+    assert not result["metrics"]["p50"]["regression"]
+    assert result["metrics"]["p99"]["regression"]
@@ -0,0 +1,43 @@
+"""Unittest for overseer api concurrent layers creation"""
+from unittest import mock
+
+import requests
+from mc_automation_tools.ingestion_api import overseer_api
+
+
+class _Response:
+    def __init__(self, status_code):
+        self.status_code = status_code
+        self.content = b""
+
+
+def _create_layers(responses, **kwargs):
+    session = mock.Mock()
+    session.post.side_effect = responses
+    with mock.patch.object(
+        overseer_api.base_requests, "create_session", return_value=session
+    ):
+        return overseer_api.Overseer("http://overseer.test").create_layers(
+            [{"metadata": {"productId": "id_1"}}], retry_backoff=0, **kwargs
+        )[0]
+
+
+def test_create_layers_retry_connection_error():
+    """
+    This check that submit is retried once after connection error and succeed
+    """
+    result = _create_layers(
+        [requests.exceptions.ConnectionError("refused"), _Response(200)]
+    )
+    assert result["success"]
+    assert result["attempts"] == 2
+
+
+def test_create_layers_server_error_not_retried_by_default():
+    """
+    This check that 500 response (not idempotent create) is retried only if retry_server_errors
+    """
+    assert _create_layers([_Response(500), _Response(200)])["attempts"] == 1
+    result = _create_layers([_Response(500), _Response(200)], retry_server_errors=True)
+    assert result["success"]
+    assert result["attempts"] == 2